@@ -8,7 +8,13 @@ __all__ = [
 
 # Import from sub-directory inits
 
-from .assets import CURRENCIES, STANDARD_SET, OTHER_PAIRS, download_assets
+from . import assets
+from .assets import download_assets
 from .services import prewarm_rates, check_for_update
 from .utils import setup_logging, session, online_status, fetch_rate
 
+# Asset tables load on first access (see assets/__init__.py)
+def __getattr__(name):
+    if name in ("CURRENCIES", "STANDARD_SET", "OTHER_PAIRS", "OTHER_INSTRUMENTS"):
+        return getattr(assets, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,8 @@ from .utils import setup_logging
 setup_logging()
 
 from .ui_classes.main_app import MainApp
+from .utils.timeline import timeline
+timeline.mark("imports")
 
 if __name__ == "__main__":
     MainApp().run()
\ No newline at end of file
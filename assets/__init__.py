@@ -5,20 +5,74 @@ from .paths import ASSETS_JSONS
 from .loader import (
     load_currencies,
     load_pairs_split,
-    load_other_instruments
+    load_other_instruments,
+    load_instrument_records
     )
 
+from .instruments import Instrument, InstrumentIndex
+from .tables import CurrencyCodes, PairTable
+from .pair_index import PairIndex
+from .search import SearchIndex, IncrementalSearch, CURRENCY, PAIR, INSTRUMENT
+
+from .compiled import (
+    load_compiled,
+    build_cache,
+    invalidate_cache
+)
+
 from .updater import (
     REMOTE_VERSION_URL,
-    download_assets
+    REMOTE_BASE_URL,
+    AssetUpdateError,
+    build_manifest,
+    download_assets,
+    local_version,
+    remote_version
 )
 
 from .previous_prices import (
     load_previous_prices,
     save_previous_prices,
-    update_previous_price
+    update_previous_price,
+    flush_previous_prices,
+    PriceJournal
 )
 
-CURRENCIES = load_currencies()
-STANDARD_SET, OTHER_PAIRS = load_pairs_split()
-OTHER_INSTRUMENTS = load_other_instruments()
\ No newline at end of file
+# Asset tables are parsed on first access rather than at import time,
+# so processes that never touch them (e.g. only fetching rates) skip the cost.
+# They come from the compiled cache, which falls back to JSON when stale.
+def _pair_table(which):
+    return PairTable.from_bytes(load_compiled()[which], _lazy("PAIR_CODES"))
+
+_LAZY_ASSETS = {
+    "CURRENCIES": lambda: list(load_compiled()["currencies"]),
+    "PAIR_CODES": lambda: CurrencyCodes(load_compiled()["pair_codes"]),
+    "STANDARD_SET": lambda: _pair_table("standard"),
+    "OTHER_PAIRS": lambda: _pair_table("other"),
+    "OTHER_INSTRUMENTS": lambda: list(load_compiled()["other_instruments"]),
+    "INSTRUMENTS": lambda: InstrumentIndex(load_compiled()["instruments"]),
+    "PAIR_INDEX": lambda: PairIndex(load_compiled()["pair_plans"]),
+    "SEARCH_INDEX": lambda: SearchIndex.build(
+        _lazy("CURRENCIES"),
+        set(_lazy("STANDARD_SET")) | set(_lazy("OTHER_PAIRS")),
+        load_compiled()["instruments"]),
+}
+
+def __getattr__(name):
+    loader = _LAZY_ASSETS.get(name)
+    if loader is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = loader()
+    # Memoize as a real module global so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def _lazy(name):
+    value = globals().get(name)
+    return value if value is not None else __getattr__(name)
+
+def reset_assets():
+    """Drop loaded tables (and the compiled cache) so they are re-read from disk."""
+    for name in _LAZY_ASSETS:
+        globals().pop(name, None)
+    invalidate_cache()
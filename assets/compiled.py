@@ -0,0 +1,135 @@
+# assets/compiled.py
+
+"""
+Precompiled asset cache.
+
+The JSON files in assets_jsons are pretty-printed and mostly fields we never
+read. compile_assets() keeps only what the app uses and build_cache() writes
+it as a single pickle next to this module. load_compiled() serves that blob
+while its stamp (asset version + source file sizes/mtimes) still matches,
+and falls back to parsing the JSON (then rewriting the cache) when it is stale.
+
+Build ahead of time with:  python -m pos_size_calc.assets.compiled
+"""
+
+import json
+import logging
+import pickle
+import threading
+
+from .paths import ASSETS_JSONS, COMPILED_CACHE
+from .loader import load_currencies, load_pairs_split, load_instrument_records
+from .tables import CurrencyCodes, PairTable
+from .pair_index import PairIndex
+
+# Bump whenever the shape of the compiled data changes
+FORMAT_VERSION = 4
+
+SOURCES = (
+    "asset_version.json",
+    "currencies.json",
+    "pairs_split.json",
+    "oanda_inst2.json",
+)
+
+_compiled = None
+_lock = threading.Lock()
+
+
+def source_stamp():
+    """Identify the current JSON sources without parsing the large ones."""
+    try:
+        with open(ASSETS_JSONS / "asset_version.json", 'r') as f:
+            version = json.load(f).get("version")
+    except (OSError, ValueError):
+        version = None
+    files = []
+    for name in SOURCES:
+        try:
+            st = (ASSETS_JSONS / name).stat()
+            files.append((name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            files.append((name, None, None))
+    return (FORMAT_VERSION, version, tuple(files))
+
+
+def compile_assets() -> dict:
+    """Parse the JSON sources down to the fields the app uses."""
+    standard, other = load_pairs_split()
+    instruments = load_instrument_records()
+    # Both pair tables share one code table; pairs are stored as packed keys
+    codes = CurrencyCodes(c for p in standard | other for c in (p[:3], p[3:]))
+    standard = PairTable.from_pairs(standard, codes)
+    other = PairTable.from_pairs(other, codes)
+    return {
+        "currencies": load_currencies(),
+        "pair_codes": list(codes.codes),
+        "standard": standard.to_bytes(),
+        "other": other.to_bytes(),
+        "pair_plans": PairIndex.build(standard, other).plans,
+        "other_instruments": [r[2] for r in instruments if r[1] != "CURRENCY"],
+        "instruments": instruments,
+    }
+
+
+def build_cache(path=COMPILED_CACHE) -> dict:
+    """Compile the sources and write the cache atomically; return the data."""
+    stamp = source_stamp()
+    data = compile_assets()
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, 'wb') as f:
+        pickle.dump({"stamp": stamp, "data": data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+    return data
+
+
+def _read_cache(path, stamp):
+    try:
+        with open(path, 'rb') as f:
+            blob = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.info(f"Compiled asset cache unreadable: {e}")
+        return None
+    if not isinstance(blob, dict) or blob.get("stamp") != stamp:
+        return None
+    return blob.get("data")
+
+
+def load_compiled(path=COMPILED_CACHE) -> dict:
+    """
+    Return the compiled asset data, memoized per process.
+    Stale or missing caches are rebuilt from JSON; if the cache cannot be
+    written (read-only storage) the freshly parsed data is still returned.
+    """
+    global _compiled
+    if _compiled is not None:
+        return _compiled
+    with _lock:
+        if _compiled is None:
+            data = _read_cache(path, source_stamp())
+            if data is None:
+                try:
+                    data = build_cache(path)
+                except OSError as e:
+                    logging.info(f"Compiled asset cache not written: {e}")
+                    data = compile_assets()
+            _compiled = data
+    return _compiled
+
+
+def invalidate_cache(path=COMPILED_CACHE):
+    """Forget the in-memory copy and remove the on-disk cache."""
+    global _compiled
+    with _lock:
+        _compiled = None
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    build_cache()
+    print(f"Wrote {COMPILED_CACHE}")
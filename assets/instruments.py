@@ -0,0 +1,95 @@
+# assets/instruments.py
+
+'''
+Instrument index built from the OANDA metadata in oanda_inst2.json.
+
+Each instrument is pre-parsed once (at asset compile time) into a compact
+numeric record, so sizing can apply margin, unit precision and min/max
+order limits with a dict lookup and no JSON access.
+'''
+
+from math import floor
+
+
+class Instrument:
+    __slots__ = (
+        "name",
+        "type",
+        "display_name",
+        "margin_rate",
+        "units_precision",
+        "min_units",
+        "max_units",
+    )
+
+    def __init__(self, name, type, display_name, margin_rate,
+                 units_precision, min_units, max_units):
+        self.name = name
+        self.type = type
+        self.display_name = display_name
+        self.margin_rate = margin_rate
+        self.units_precision = units_precision
+        self.min_units = min_units
+        self.max_units = max_units
+
+    def __repr__(self):
+        return f"Instrument({self.name!r}, {self.display_name!r})"
+
+    @property
+    def quote_currency(self):
+        """Currency the instrument is priced in, e.g. USD for XAG_USD."""
+        return self.name.rsplit("_", 1)[-1]
+
+    @property
+    def max_leverage(self):
+        return 1.0 / self.margin_rate if self.margin_rate > 0 else 1.0
+
+    def effective_leverage(self, leverage):
+        """Requested leverage, capped by what the margin rate allows."""
+        return min(leverage, self.max_leverage)
+
+    def size_units(self, raw_units):
+        """
+        Round raw_units down to the tradeable precision and clamp to the
+        order limits. Below the minimum trade size nothing can be traded.
+        """
+        if self.units_precision > 0:
+            step = 10 ** self.units_precision
+            units = floor(raw_units * step) / step
+        else:
+            units = floor(raw_units)
+        if units < self.min_units:
+            return 0
+        if self.max_units and units > self.max_units:
+            units = int(self.max_units) if self.units_precision <= 0 else self.max_units
+        return units
+
+
+class InstrumentIndex:
+    """Instruments keyed by OANDA name, with a display-name lookup."""
+    def __init__(self, records):
+        self._by_name = {}
+        self._by_display = {}
+        for rec in records:
+            inst = Instrument(*rec)
+            self._by_name[inst.name] = inst
+            self._by_display[inst.display_name] = inst
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
+    def get(self, name, default=None):
+        """Look up by OANDA name ("XAG_USD") or display name ("Silver")."""
+        inst = self._by_name.get(name)
+        if inst is None:
+            inst = self._by_display.get(name, default)
+        return inst
@@ -28,4 +28,22 @@ def load_other_instruments():
             data = json.load(f)
         instruments = data["instruments"]
         other_insts = [instruments[i]["displayName"] for i in range(len(instruments)) if instruments[i]["type"] != "CURRENCY"]
-        return other_insts
\ No newline at end of file
+        return other_insts
+
+# Numeric OANDA fields used for sizing, one tuple per instrument:
+# (name, type, displayName, marginRate, tradeUnitsPrecision,
+#  minimumTradeSize, maximumOrderUnits)
+def load_instrument_records():
+    data = load_json("oanda_inst2.json")
+    return [
+        (
+            inst["name"],
+            inst["type"],
+            inst["displayName"],
+            float(inst.get("marginRate", 1)),
+            int(inst.get("tradeUnitsPrecision", 0)),
+            float(inst.get("minimumTradeSize", 1)),
+            float(inst.get("maximumOrderUnits", 0)),
+        )
+        for inst in data["instruments"]
+    ]
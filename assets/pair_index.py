@@ -0,0 +1,86 @@
+# assets/pair_index.py
+
+'''
+Precomputed pair-direction index.
+
+Every ordered currency pair maps to a resolution plan (kind, source), where
+source is the one base currency whose rate snapshot is needed:
+
+    IDENTITY     rate = 1
+    DIRECT       rate = snap(a)[b]              a->b is a standard pair
+    INVERSE      rate = 1 / snap(b)[a]          b->a is a standard pair
+    TRIANGULATE  rate = snap(p)[b] / snap(p)[a] via pivot p
+
+Built once from pairs_split.json (and stored in the compiled asset cache),
+so resolving a pair is one dict lookup and pricing it is one read of a
+single base snapshot.
+'''
+
+IDENTITY, DIRECT, INVERSE, TRIANGULATE = range(4)
+
+KIND_NAMES = {
+    IDENTITY: "identity",
+    DIRECT: "direct",
+    INVERSE: "inverse",
+    TRIANGULATE: "triangulated",
+}
+
+# Pivot currencies, in order of preference (EUR is Frankfurter's own base)
+PIVOTS = ("EUR", "USD")
+
+
+class PairIndex:
+    def __init__(self, plans):
+        self._plans = plans
+
+    @classmethod
+    def build(cls, standard, other, pivots=PIVOTS):
+        """standard / other are PairTables sharing one CurrencyCodes."""
+        codes = standard.currencies.codes
+        plans = {}
+        for a in codes:
+            for b in codes:
+                plans[(a, b)] = cls._build_plan(a, b, standard, other, pivots)
+        return cls(plans)
+
+    @property
+    def plans(self):
+        return self._plans
+
+    @staticmethod
+    def _quoted(table_a, table_b, base, quote):
+        return table_a.has(base, quote) or table_b.has(base, quote)
+
+    @classmethod
+    def _build_plan(cls, a, b, standard, other, pivots):
+        if a == b:
+            return (IDENTITY, a)
+        if standard.has(a, b):
+            return (DIRECT, a)
+        if standard.has(b, a):
+            return (INVERSE, b)
+        for p in pivots:
+            if p == a:
+                return (DIRECT, a)
+            if p == b:
+                return (INVERSE, b)
+            if cls._quoted(standard, other, p, a) and cls._quoted(standard, other, p, b):
+                return (TRIANGULATE, p)
+        # last-ditch: try the direct quote anyway
+        return (DIRECT, a)
+
+    def plan(self, a, b):
+        """Return (kind, source_base) for pricing a->b."""
+        plan = self._plans.get((a, b))
+        if plan is None:
+            plan = (IDENTITY, a) if a == b else (DIRECT, a)
+        return plan
+
+    def __len__(self):
+        return len(self._plans)
+
+    def describe(self, a, b):
+        kind, source = self.plan(a, b)
+        if kind == TRIANGULATE:
+            return f"via {source}"
+        return KIND_NAMES[kind]
@@ -3,4 +3,7 @@
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent
-ASSETS_JSONS = BASE_DIR / "assets_jsons"
\ No newline at end of file
+ASSETS_JSONS = BASE_DIR / "assets_jsons"
+COMPILED_CACHE = BASE_DIR / "compiled_assets.pickle"
+RATE_STORE = BASE_DIR / "rate_store.sqlite3"
+UPDATE_STATE = BASE_DIR / "asset_update_state.json"
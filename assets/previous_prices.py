@@ -1,24 +1,219 @@
 # assets/previuos_prices.py
 
+'''
+Last-known price per pair, recorded write-behind.
+
+Prices live in memory. update_previous_price() only changes the in-memory
+dict and marks the pair dirty: O(1), no I/O on the caller's thread. A
+daemon writer wakes every flush_interval seconds and appends the latest
+value of each dirty pair to previous_prices.jsonl in one write, so a pair
+updated a hundred times between flushes costs one line.
+
+The journal is replayed over the previous_prices.json snapshot on load.
+Once it holds compact_ratio times as many lines as there are pairs (and
+at least compact_min), the whole dict is written to a temp snapshot,
+fsynced, renamed over the old one (the directory fsynced too) and only
+then is the journal emptied. A crash at any point is safe:
+before the rename the old snapshot plus the journal is still complete;
+after it, replaying the old journal over the new snapshot changes nothing.
+A torn last line left by a crash mid-append is skipped and cut off.
+'''
+
+import atexit
 import json
+import logging
+import os
+import threading
+
 from .paths import ASSETS_JSONS
 
 PREVIOUS_FILE = ASSETS_JSONS / "previous_prices.json"
+JOURNAL_FILE = ASSETS_JSONS / "previous_prices.jsonl"
 
-def load_previous_prices():
+
+class PriceJournal:
+    def __init__(self, snapshot=PREVIOUS_FILE, journal=JOURNAL_FILE,
+                 flush_interval=1.0, compact_ratio=4, compact_min=1000):
+        self.snapshot = snapshot
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._prices = None
+        self._dirty = {}
+        self._journal_lines = 0
+        self._lock = threading.Lock()       # guards _prices / _dirty; never held over I/O
+        self._io_lock = threading.Lock()    # serialises file writes
+        self._wake = threading.Event()
+        self._writer = None
+
+    def _loaded(self):
+        if self._prices is None:
+            with self._io_lock:
+                if self._prices is None:
+                    prices = self._read_snapshot()
+                    self._journal_lines = self._replay(prices)
+                    with self._lock:
+                        self._prices = prices
+        return self._prices
+
+    def _read_snapshot(self):
+        try:
+            prices = json.loads(self.snapshot.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+        return prices if isinstance(prices, dict) else {}
+
+    def _replay(self, prices):
+        """Apply the journal to `prices`; cut off a torn tail. Returns the line count."""
+        try:
+            with open(self.journal, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        good, lines = 0, 0
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("torn line")
+                pair, price = json.loads(line)
+            except (ValueError, TypeError):
+                break
+            prices[pair] = price
+            good += len(line)
+            lines += 1
+        if good < len(data):
+            logging.info(f"Previous prices journal: dropped {len(data) - good} bytes of torn tail")
+            with open(self.journal, "r+b") as f:
+                f.truncate(good)
+        return lines
+
+    def prices(self):
+        """Copy of every last-known price."""
+        prices = self._loaded()
+        with self._lock:
+            return dict(prices)
+
+    def get(self, pair, default=None):
+        self._loaded()
+        with self._lock:
+            return self._prices.get(pair, default)
+
+    def update(self, pair, price):
+        self._loaded()
+        with self._lock:
+            self._prices[pair] = price      # not a local: replace() may swap the dict
+            self._dirty[pair] = price
+        self._ensure_writer()
+
+    def replace(self, prices):
+        """Make `prices` the whole set and write it out as a snapshot now."""
+        self._loaded()
+        with self._lock:
+            self._prices = dict(prices)
+            self._dirty.clear()
+        self.compact()
+
+    def flush(self):
+        """Append every dirty pair to the journal (compacting if it has grown)."""
+        with self._io_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return 0
+            lines = "".join(json.dumps([pair, price]) + "\n" for pair, price in dirty.items())
+            try:
+                self.journal.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                # Keep them dirty (unless updated since) and retry next flush
+                with self._lock:
+                    for pair, price in dirty.items():
+                        self._dirty.setdefault(pair, price)
+                logging.warning(f"Previous prices not journaled: {e}")
+                return 0
+            self._journal_lines += len(dirty)
+            limit = max(self.compact_min, self.compact_ratio * len(self._prices))
+            if self._journal_lines >= limit:
+                self._compact()
+        return len(dirty)
+
+    def compact(self):
+        """Write the full snapshot and empty the journal."""
+        self._loaded()
+        with self._io_lock:
+            with self._lock:
+                self._dirty.clear()     # the snapshot includes them
+            self._compact()
+
+    def _compact(self):
+        with self._lock:
+            prices = dict(self._prices)
+        self.snapshot.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(prices, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.snapshot)
+        _fsync_dir(self.snapshot.parent)
+        # The new snapshot is durable; only now may the journal go
+        with open(self.journal, "w", encoding="utf-8") as f:
+            os.fsync(f.fileno())
+        self._journal_lines = 0
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True,
+                                                name="previous-prices-writer")
+                self._writer.start()
+                atexit.register(self.close)
+
+    def close(self):
+        """Stop the writer and flush what is left."""
+        self._wake.set()
+        self.flush()
+
+    def _write_loop(self):
+        while not self._wake.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Previous prices flush failed")
+
+
+def _fsync_dir(path):
+    """Make a rename in `path` durable (not possible on Windows; skipped there)."""
     try:
-        text = PREVIOUS_FILE.read_text(encoding="utf-8")
-        return json.loads(text)
-    except (FileNotFoundError, ValueError):
-        return {}
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# Process-wide journal behind the functions below
+journal = PriceJournal()
+
+
+def load_previous_prices():
+    return journal.prices()
 
 def save_previous_prices(prices: dict):
-    ASSETS_JSONS.mkdir(parents=True, exist_ok=True)
-    tmp = PREVIOUS_FILE.with_suffix(".tmp")
-    tmp.write_text(json.dumps(prices, indent=2), encoding="utf-8")
-    tmp.replace(PREVIOUS_FILE)
+    journal.replace(prices)
 
 def update_previous_price(pair: str, price: float):
-    rates = load_previous_prices()
-    rates[pair] = price
-    save_previous_prices(rates)
+    journal.update(pair, price)
+
+def flush_previous_prices():
+    return journal.flush()
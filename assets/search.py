@@ -0,0 +1,178 @@
+# assets/search.py
+
+'''
+Type-ahead search over currencies, pairs and OANDA instruments.
+
+Every entry is indexed under a few normalized terms (lowercase, letters and
+digits only): its code or OANDA name, its display name, and the display
+name from each later word on. The terms live in one sorted list, so a
+prefix query is two bisects and a slice. IncrementalSearch keeps the bisect range of every
+prefix typed so far: each keystroke narrows the previous range, and
+backspace just pops back to it. Nothing is rescanned.
+
+When a prefix finds fewer than FUZZY_BELOW entries, a fuzzy pass matches
+the query as a subsequence ("uthb" -> USDTHB, "slvr" -> Silver) among the
+terms that share its first character. IncrementalSearch narrows that too:
+a term that does not match a query cannot match the query extended by a
+keystroke, so each keystroke only re-checks the previous keystroke's fuzzy
+matches.
+'''
+
+from array import array
+from bisect import bisect_left
+
+CURRENCY, PAIR, INSTRUMENT = "currency", "pair", "instrument"
+
+# Prefix hits below this many are topped up with fuzzy matches
+FUZZY_BELOW = 10
+
+# Sorts after every normalized term that starts with a given prefix
+_HIGH = "\U0010ffff"
+
+
+def normalize(text):
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+class SearchIndex:
+    def __init__(self, entries, terms, ids, ranks):
+        self.entries = entries      # [(kind, value, label)]
+        self.terms = terms          # sorted normalized terms
+        self.ids = ids              # entry id for each term
+        self.ranks = ranks          # 0 = code/name/full display name, 1 = from a later word
+
+    @classmethod
+    def build(cls, currencies, pairs, instrument_records):
+        """
+        currencies: codes; pairs: "EURUSD" names; instrument_records: compiled
+        (name, type, displayName, ...) tuples (currency instruments are pairs).
+        """
+        entries, postings = [], set()
+
+        def add(kind, value, label, primary, words=()):
+            eid = len(entries)
+            entries.append((kind, value, label))
+            for term in primary:
+                postings.add((normalize(term), 0, eid))
+            for term in words:
+                postings.add((normalize(term), 1, eid))
+
+        for code in currencies:
+            add(CURRENCY, code, code, (code,))
+        for pair in pairs:
+            add(PAIR, pair, pair, (pair,))
+        for name, kind, display, *_ in instrument_records:
+            if kind == "CURRENCY":
+                continue
+            # "US Wall St 30" is also found from "wall", "wall st", "st 30"...
+            words = display.replace("/", " ").split()
+            add(INSTRUMENT, display, f"{display} ({name})", (name, display),
+                (" ".join(words[i:]) for i in range(1, len(words))))
+
+        postings = sorted(p for p in postings if p[0])
+        return cls(entries,
+                   [p[0] for p in postings],
+                   array('I', (p[2] for p in postings)),
+                   array('B', (p[1] for p in postings)))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def prefix_range(self, prefix, lo=0, hi=None):
+        """[lo, hi) of the terms starting with prefix, searched within [lo, hi)."""
+        hi = len(self.terms) if hi is None else hi
+        lo = bisect_left(self.terms, prefix, lo, hi)
+        return lo, bisect_left(self.terms, prefix + _HIGH, lo, hi)
+
+    def search(self, query, kinds=None, limit=50, values=None):
+        """values: optional set of entry values to restrict the results to."""
+        q = normalize(query)
+        if not q:
+            return []
+        return self.collect(q, *self.prefix_range(q), kinds=kinds, limit=limit, values=values)
+
+    def collect(self, q, lo, hi, kinds=None, limit=50, values=None):
+        """Rank the prefix hits in [lo, hi), topped up with fuzzy matches when few."""
+        return self._collect(q, lo, hi, kinds, limit, values)[0]
+
+    def _collect(self, q, lo, hi, kinds, limit, values, candidates=None):
+        """
+        Returns (hits, fuzzy term indices or None if no fuzzy pass ran).
+        candidates: term indices known to hold every fuzzy match of q.
+        """
+        best = {}
+        for i in range(lo, hi):
+            eid = self.ids[i]
+            key = (self.ranks[i], len(self.terms[i]))
+            if eid not in best or key < best[eid]:
+                best[eid] = key
+        hits = self._rank(best, kinds, values)
+        matched = None
+        if len(hits) < min(limit, FUZZY_BELOW):
+            matched = self.fuzzy_matches(q, candidates)
+            fuzzy = {}
+            for i in matched:
+                eid = self.ids[i]
+                # Tighter matches first: fewer skipped characters
+                key = (self.ranks[i] + 2, len(self.terms[i]) - len(q))
+                if eid not in best and (eid not in fuzzy or key < fuzzy[eid]):
+                    fuzzy[eid] = key
+            hits += self._rank(fuzzy, kinds, values)
+        return hits[:limit], matched
+
+    def _rank(self, scored, kinds, values=None):
+        entries = self.entries
+        ranked = sorted(scored, key=lambda eid: (scored[eid], entries[eid][2]))
+        return [entries[eid] for eid in ranked
+                if (kinds is None or entries[eid][0] in kinds)
+                and (values is None or entries[eid][1] in values)]
+
+    def fuzzy_matches(self, q, candidates=None):
+        """Indices of the terms containing q as a subsequence (same first character)."""
+        if candidates is None:
+            candidates = range(*self.prefix_range(q[0]))
+        rest = q[1:]
+        matched = []
+        for i in candidates:
+            term = self.terms[i]
+            pos = 0
+            for ch in rest:
+                pos = term.find(ch, pos + 1)
+                if pos < 0:
+                    break
+            else:
+                matched.append(i)
+        return matched
+
+
+class IncrementalSearch:
+    """
+    Filter-as-you-type session; call update(text) on every keystroke.
+    values: optional set of entry values (e.g. a picker's list) to restrict to.
+    """
+
+    def __init__(self, index, kinds=None, limit=50, values=None):
+        self.index = index
+        self.kinds = kinds
+        self.limit = limit
+        self.values = values
+        # (query, prefix range lo, hi, fuzzy matches or None)
+        self._stack = [("", 0, len(index.terms), None)]
+
+    def update(self, text):
+        q = normalize(text)
+        # Back up to the longest prefix already narrowed (handles backspace)
+        while not q.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        if not q:
+            return []
+        prefix, lo, hi, fuzzy = self._stack[-1]
+        if q == prefix:
+            self._stack.pop()
+        else:
+            lo, hi = self.index.prefix_range(q, lo, hi)
+        # A shorter query's fuzzy matches bound this one's (None: the whole bucket)
+        hits, matched = self.index._collect(q, lo, hi, self.kinds, self.limit, self.values,
+                                            fuzzy)
+        self._stack.append((q, lo, hi, fuzzy if matched is None else matched))
+        return hits
@@ -0,0 +1,126 @@
+# assets/tables.py
+
+'''
+Compact pair tables.
+
+Currency codes are interned to small ints (in alphabetical order), and each
+pair is packed into one unsigned 16-bit key, (base_id << 8) | quote_id,
+held in a sorted array('H'). Because ids follow alphabetical order, key
+order is also the sorted "EURUSD" listing, so membership is a bisect and
+sorted iteration needs no extra work. 862 pairs take ~1.7 KB instead of a
+set of 862 six-character strings.
+'''
+
+from array import array
+from bisect import bisect_left
+
+
+class CurrencyCodes:
+    """Bidirectional code <-> small int mapping."""
+    __slots__ = ("codes", "_ids")
+
+    def __init__(self, codes=()):
+        self.codes = []
+        self._ids = {}
+        for code in sorted(set(codes)):
+            self.intern(code)
+
+    def intern(self, code):
+        cid = self._ids.get(code)
+        if cid is None:
+            cid = len(self.codes)
+            if cid > 0xFF:
+                raise ValueError("More than 256 currency codes")
+            self.codes.append(code)
+            self._ids[code] = cid
+        return cid
+
+    def id(self, code):
+        return self._ids.get(code)
+
+    def code(self, cid):
+        return self.codes[cid]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._ids
+
+
+class PairTable:
+    """
+    Read-only set of 6-letter pairs ("EURUSD") backed by packed uint16 keys.
+    Behaves like the set it replaces for `in`, iteration, len and sorted().
+    """
+    __slots__ = ("currencies", "_keys")
+
+    def __init__(self, currencies, keys):
+        self.currencies = currencies
+        self._keys = keys
+
+    @classmethod
+    def from_pairs(cls, pairs, currencies=None):
+        if currencies is None:
+            currencies = CurrencyCodes(c for p in pairs for c in (p[:3], p[3:]))
+        keys = sorted({(currencies.intern(p[:3]) << 8) | currencies.intern(p[3:])
+                       for p in pairs})
+        return cls(currencies, array('H', keys))
+
+    @classmethod
+    def from_bytes(cls, data, currencies):
+        keys = array('H')
+        keys.frombytes(data)
+        return cls(currencies, keys)
+
+    def to_bytes(self):
+        return self._keys.tobytes()
+
+    def _key(self, base, quote):
+        b = self.currencies.id(base)
+        q = self.currencies.id(quote)
+        if b is None or q is None:
+            return None
+        return (b << 8) | q
+
+    def has(self, base, quote):
+        """Membership by (base, quote) codes."""
+        key = self._key(base, quote)
+        if key is None:
+            return False
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def __contains__(self, pair):
+        # Same semantics as the set of strings: only "EURUSD"-style members
+        if not isinstance(pair, str) or len(pair) != 6:
+            return False
+        return self.has(pair[:3], pair[3:])
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        codes = self.currencies.codes
+        for key in self._keys:
+            yield codes[key >> 8] + codes[key & 0xFF]
+
+    def pairs(self):
+        """Yield (base, quote) tuples in sorted order."""
+        codes = self.currencies.codes
+        for key in self._keys:
+            yield codes[key >> 8], codes[key & 0xFF]
+
+    def quotes_for(self, base):
+        """Sorted quotes listed against `base`."""
+        b = self.currencies.id(base)
+        if b is None:
+            return []
+        lo = bisect_left(self._keys, b << 8)
+        hi = bisect_left(self._keys, (b + 1) << 8)
+        codes = self.currencies.codes
+        return [codes[k & 0xFF] for k in self._keys[lo:hi]]
+
+    def sorted_names(self):
+        """Sorted list of "EURUSD" strings (keys are already in order)."""
+        return list(self)
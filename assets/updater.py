@@ -1,12 +1,236 @@
 # assets/updater.py
 
+'''
+Asset updates from a remote manifest.
+
+The server publishes, next to the asset files, a manifest.json:
+
+    {"version": "1.1.0",
+     "files": {"currencies.json": {"sha256": "<hex>", "size": 281}, ...}}
+
+download_assets() fetches the manifest with If-None-Match (304 means
+nothing changed since the last update), hashes the local copies and
+downloads only the files whose sha256 differs, in parallel on the shared
+executor. Each file is streamed to a temp file in assets_jsons and checked
+against the manifest's size and hash; a failed download leaves the current
+assets untouched. Once every changed file has verified, they are renamed
+over the old ones (os.replace, atomic per file) with asset_version.json
+last. An interrupted swap therefore keeps the old version stamp: the next
+check offers the update again and fetches only the files still behind.
+The compiled cache and the loaded tables are then dropped so the next
+access re-reads them.
+
+The manifest's ETag is kept in UPDATE_STATE once an update has completed
+and sent back on the next run. Files are always fetched unconditionally:
+they are only requested when their hash is known to differ.
+'''
+
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import wait
 
+from .paths import ASSETS_JSONS, UPDATE_STATE
+
+REMOTE_BASE_URL = "https://my.server.com/assets/"
 REMOTE_VERSION_URL = "https://my.server.com/asset_version.json"
+MANIFEST_NAME = "manifest.json"
+VERSION_FILE = "asset_version.json"
+# Written by the app itself; never published or overwritten by an update
+LOCAL_FILES = ("previous_prices.json", "previous_prices.jsonl")
+
+CHUNK_SIZE = 64 * 1024
+
+_update_lock = threading.Lock()
+
+
+class AssetUpdateError(Exception):
+    """The remote manifest or a downloaded file could not be used."""
+
+
+def file_sha256(path):
+    """Hex sha256 of a file, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def build_manifest(version, directory=ASSETS_JSONS, names=None):
+    """Manifest for the files in `directory` (server side: publish this as manifest.json)."""
+    if names is None:
+        names = sorted(p.name for p in directory.glob("*.json")
+                       if p.name != MANIFEST_NAME and p.name not in LOCAL_FILES)
+    return {
+        "version": version,
+        "files": {name: {"sha256": file_sha256(directory / name),
+                         "size": (directory / name).stat().st_size}
+                  for name in names},
+    }
+
+
+def local_version():
+    with open(ASSETS_JSONS / VERSION_FILE, 'r', encoding="utf-8") as f:
+        return json.load(f)["version"]
+
+
+def remote_version(session=None, url=REMOTE_VERSION_URL, timeout=5):
+    session = session or _default_session()
+    resp = session.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()["version"]
+
+
+def _default_session():
+    # Imported here: utils.network imports assets.paths, which loads this package
+    from ..utils.network import session
+    return session
 
-def download_assets(remote_ver: str) -> None:
+
+def _load_state():
+    try:
+        with open(UPDATE_STATE, 'r', encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {"etags": {}}
+    return state if isinstance(state.get("etags"), dict) else {"etags": {}}
+
+
+def _save_state(state):
+    try:
+        _write_atomic(UPDATE_STATE, json.dumps(state, indent=2).encode("utf-8"))
+    except OSError as e:
+        logging.info(f"Asset update state not saved: {e}")
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        _discard(tmp)
+        raise
+
+
+def _discard(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _conditional_headers(etags, key):
+    entry = etags.get(key)
+    return {"If-None-Match": entry["etag"]} if entry else {}
+
+
+def fetch_manifest(session, base_url, etags, timeout=10):
+    """The remote manifest, or None if it has not changed since the last update."""
+    resp = session.get(base_url + MANIFEST_NAME, timeout=timeout,
+                       headers=_conditional_headers(etags, MANIFEST_NAME))
+    if resp.status_code == 304:
+        return None
+    resp.raise_for_status()
+    manifest = resp.json()
+    if not isinstance(manifest.get("files"), dict) or "version" not in manifest:
+        raise AssetUpdateError("Malformed asset manifest")
+    for name in manifest["files"]:
+        # Names are joined onto assets_jsons; refuse anything that could escape it
+        if os.path.basename(name) != name or name in ("", ".", "..") or name in LOCAL_FILES:
+            raise AssetUpdateError(f"Bad file name in manifest: {name!r}")
+    if resp.headers.get("ETag"):
+        etags[MANIFEST_NAME] = {"etag": resp.headers["ETag"]}
+    return manifest
+
+
+def _download(session, url, name, expected, timeout=30):
+    """Stream `url` into a temp file beside `name`, verify it and return the temp path."""
+    with session.get(url, timeout=timeout, stream=True) as resp:
+        if resp.status_code == 304:
+            # Nothing conditional was sent; a 304 here is a misbehaving server
+            raise AssetUpdateError(f"{name}: unexpected 304 for a changed file")
+        resp.raise_for_status()
+        fd, tmp = tempfile.mkstemp(dir=ASSETS_JSONS, prefix=name + ".", suffix=".part")
+        digest, size = hashlib.sha256(), 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            if expected.get("size") is not None and size != expected["size"]:
+                raise AssetUpdateError(f"{name}: got {size} bytes, expected {expected['size']}")
+            if digest.hexdigest() != expected["sha256"]:
+                raise AssetUpdateError(f"{name}: sha256 mismatch")
+        except BaseException:
+            _discard(tmp)
+            raise
+    return tmp
+
+
+def download_assets(remote_ver=None, base_url=REMOTE_BASE_URL, session=None):
     """
-    Compare local asset version vs. remote_ver and download if newer.
-    Stubbed out here—fill in your HTTP+filesystem logic.
+    Bring assets_jsons up to the remote manifest. Returns the names of the
+    files replaced (empty when already current). Raises AssetUpdateError (or
+    the request's error) if anything fails before the swap, in which case no
+    asset file has been changed.
     """
-    logging.info(f"Would download new assets v{remote_ver}")
\ No newline at end of file
+    from . import reset_assets
+    # Imported here for the same reason as the session
+    from ..utils.threads import executor, REFRESH
+
+    session = session or _default_session()
+    with _update_lock:
+        state = _load_state()
+        etags = state["etags"]
+        manifest = fetch_manifest(session, base_url, etags)
+        if manifest is None:
+            logging.info("Assets up to date (manifest not modified)")
+            return []
+        if remote_ver is not None and manifest["version"] != remote_ver:
+            raise AssetUpdateError(f"Asset manifest is v{manifest['version']}, "
+                                   f"expected v{remote_ver}")
+
+        local = {name: file_sha256(ASSETS_JSONS / name) for name in manifest["files"]}
+        changed = [name for name, meta in manifest["files"].items()
+                   if local[name] != meta["sha256"]]
+
+        # REFRESH, not PREWARM: this call may itself hold a PREWARM worker
+        futures = {name: executor.submit(_download, session, base_url + name, name,
+                                         manifest["files"][name], priority=REFRESH)
+                   for name in changed}
+        wait(futures.values())
+        failed = [f.exception() for f in futures.values() if f.exception() is not None]
+        if failed:
+            # One failure voids the update: keep every current file as it is
+            for future in futures.values():
+                if future.exception() is None:
+                    _discard(future.result())
+            raise failed[0]
+        downloaded = {name: future.result() for name, future in futures.items()}
+
+        # Everything verified; swap the files in, the version stamp last
+        for name in sorted(downloaded, key=lambda name: name == VERSION_FILE):
+            os.replace(downloaded[name], ASSETS_JSONS / name)
+        if VERSION_FILE not in manifest["files"] and local_version() != manifest["version"]:
+            _write_atomic(ASSETS_JSONS / VERSION_FILE,
+                          json.dumps({"version": manifest["version"]}).encode("utf-8"))
+            downloaded.setdefault(VERSION_FILE, None)
+
+        _save_state(state)
+        if downloaded:
+            reset_assets()
+        logging.info(f"Assets updated to v{manifest['version']}: "
+                     f"{', '.join(sorted(downloaded)) or 'no files changed'}")
+        return sorted(downloaded)
@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+
+"""
+Reproducible benchmarks for the sizing and rate hot paths, run against a
+local stand-in for the Frankfurter API (see stub_server.py).
+"""
+
+from .stub_server import StubRateServer
@@ -0,0 +1,281 @@
+# benchmarks/run.py
+
+'''
+Benchmark suite for the sizing and rate hot paths.
+
+Every network-facing benchmark runs against StubRateServer on localhost
+with a throwaway rate store, so results are reproducible and comparable
+between commits:
+
+    python -m pos_size_calc.benchmarks -o before.json
+    ... change things ...
+    python -m pos_size_calc.benchmarks -o after.json
+    python -m pos_size_calc.benchmarks --compare before.json after.json
+'''
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import wait
+from contextlib import contextmanager
+from pathlib import Path
+
+from .stub_server import StubRateServer
+
+PACKAGE = __package__.rsplit(".", 1)[0]
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+PACKAGE_PARENT = PACKAGE_DIR.parent
+
+
+@contextmanager
+def stubbed_rate_layer(stub, tmpdir):
+    """Point the rate layer at the stub server and a temporary rate store."""
+    from ..utils import network
+    from ..utils.providers import FrankfurterProvider
+    from ..utils.rate_store import RateStore
+
+    saved = (network.rate_router.providers, network.rate_store)
+    network.rate_router.providers = [
+        FrankfurterProvider(network.provider_session, url=stub.url + "/latest")]
+    network.rate_store = RateStore(Path(tmpdir) / "rates.sqlite3")
+    network.rate_cache.clear()
+    network.rate_cache.reset_stats()
+    try:
+        yield network
+    finally:
+        network.rate_router.providers, network.rate_store = saved
+        network.rate_cache.clear()
+
+
+def _reset_rates(network, tmpdir, name):
+    from ..utils.rate_store import RateStore
+    network.rate_cache.clear()
+    network.rate_store = RateStore(Path(tmpdir) / f"{name}.sqlite3")
+
+
+def _ms(seconds):
+    return round(seconds * 1000.0, 4)
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": _ms(ordered[len(ordered) // 2]),
+        "p95_ms": _ms(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]),
+    }
+
+
+def bench_calculate(n):
+    """PositionSizer.calculate throughput with a warm cache."""
+    from .. import assets
+    from ..tool_classes.position_sizer import PositionSizer
+
+    rng = random.Random(1)
+    codes = assets.CURRENCIES
+    rows = [(rng.uniform(1e3, 1e6), rng.uniform(1, 100), rng.uniform(1, 500),
+             rng.choice(codes), rng.choice(codes)) for _ in range(n)]
+    for row in rows[:200]:          # warm every snapshot the rows touch
+        PositionSizer(*row).calculate()
+
+    t0 = time.perf_counter()
+    for row in rows:
+        PositionSizer(*row).calculate()
+    elapsed = time.perf_counter() - t0
+    return {"ops_per_sec": round(n / elapsed), "us_per_op": round(elapsed / n * 1e6, 3)}
+
+
+def bench_size_batch(n):
+    """size_batch throughput over n rows with a warm cache."""
+    from .. import assets
+    from ..tool_classes.position_sizer import size_batch, load_numpy
+    if load_numpy() is None:
+        return {"skipped": "numpy not installed"}
+
+    rng = random.Random(2)
+    codes = assets.CURRENCIES
+    args = (
+        [rng.uniform(1e3, 1e6) for _ in range(n)],
+        [rng.uniform(1, 100) for _ in range(n)],
+        [rng.uniform(1, 500) for _ in range(n)],
+        [rng.choice(codes) for _ in range(n)],
+        [rng.choice(codes) for _ in range(n)],
+    )
+    size_batch(*args)
+    t0 = time.perf_counter()
+    size_batch(*args)
+    elapsed = time.perf_counter() - t0
+    return {"rows_per_sec": round(n / elapsed), "ms_per_batch": _ms(elapsed)}
+
+
+def bench_fetch_rate(network, stub, tmpdir, warm_calls):
+    """fetch_rate latency: cold (HTTP via stub) and warm (cache hit)."""
+    _reset_rates(network, tmpdir, "fetch_rate")
+    pairs = [("EUR", q) for q in ("USD", "GBP", "JPY", "CHF", "AUD", "CAD",
+                                  "NZD", "SEK", "NOK", "PLN")]
+    cold = []
+    for base, quote in pairs:
+        t0 = time.perf_counter()
+        network.fetch_rate(base, quote)
+        cold.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for i in range(warm_calls):
+        network.fetch_rate(*pairs[i % len(pairs)])
+    warm = (time.perf_counter() - t0) / warm_calls
+    return {"cold": _percentiles(cold), "warm_us": round(warm * 1e6, 3),
+            "requests": stub.requests}
+
+
+def bench_prewarm(network, stub, tmpdir):
+    """Wall time for prewarm to land every standard pair, and requests used."""
+    from ..services.startup import _prewarm
+
+    _reset_rates(network, tmpdir, "prewarm")
+    before = stub.requests
+    t0 = time.perf_counter()
+    wait(_prewarm())
+    return {"wall_ms": _ms(time.perf_counter() - t0), "requests": stub.requests - before}
+
+
+def _run_python(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PACKAGE_PARENT, capture_output=True, text=True, check=True)
+
+
+def bench_import(runs):
+    """Asset import time (-X importtime) and first table access, in fresh processes."""
+    self_us, cumulative_us, first_access_ms = [], [], []
+    code = (f"import time, {PACKAGE}.assets as a\n"
+            "t = time.perf_counter()\n"
+            "a.CURRENCIES; a.STANDARD_SET; a.OTHER_PAIRS; a.INSTRUMENTS; a.PAIR_INDEX\n"
+            "print((time.perf_counter() - t) * 1000)")
+    for _ in range(runs):
+        proc = _run_python(code)
+        first_access_ms.append(float(proc.stdout.strip()))
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 3 and parts[2] == f"{PACKAGE}.assets":
+                self_us.append(int(parts[0].split(":")[-1]))
+                cumulative_us.append(int(parts[1]))
+    return {
+        "assets_self_us": statistics.median(self_us),
+        "assets_cumulative_us": statistics.median(cumulative_us),
+        "first_access_ms": round(statistics.median(first_access_ms), 3),
+    }
+
+
+def bench_memory():
+    """Peak traced memory and max RSS: load all assets and size 1000 rows offline."""
+    code = (
+        "import tracemalloc, resource\n"
+        "tracemalloc.start()\n"
+        f"from {PACKAGE} import assets\n"
+        f"from {PACKAGE}.tool_classes.position_sizer import PositionSizer\n"
+        "assets.CURRENCIES; assets.OTHER_PAIRS; assets.INSTRUMENTS; assets.PAIR_INDEX\n"
+        "for i in range(1000):\n"
+        "    PositionSizer(1e5, 10, 12.5, 'EUR', 'USD', manual_rate=1.08).calculate()\n"
+        "print(tracemalloc.get_traced_memory()[1], "
+        "resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    )
+    peak, maxrss = _run_python(code).stdout.split()
+    return {"traced_peak_kb": round(int(peak) / 1024, 1), "max_rss_kb": int(maxrss)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PACKAGE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(latency, error_rate, quick=False):
+    n = 2_000 if quick else 20_000
+    results = {}
+    with StubRateServer(latency=latency, error_rate=error_rate) as stub, \
+            tempfile.TemporaryDirectory() as tmpdir, \
+            stubbed_rate_layer(stub, tmpdir) as network:
+        results["fetch_rate"] = bench_fetch_rate(network, stub, tmpdir, n)
+        results["prewarm"] = bench_prewarm(network, stub, tmpdir)
+        results["calculate"] = bench_calculate(n)
+        results["size_batch"] = bench_size_batch(n * 5)
+        results["rate_cache"] = network.cache_stats()
+    results["import"] = bench_import(3 if quick else 7)
+    results["memory"] = bench_memory()
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "stub_latency_s": latency,
+            "stub_error_rate": error_rate,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for key, value in d.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def compare(old_path, new_path):
+    """Print every numeric metric present in both result files with its change."""
+    with open(old_path) as f:
+        old = _flatten(json.load(f)["results"])
+    with open(new_path) as f:
+        new = _flatten(json.load(f)["results"])
+    print(f"{'metric':40}{'old':>14}{'new':>14}{'change':>10}")
+    for name in sorted(old.keys() & new.keys()):
+        a, b = old[name], new[name]
+        change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+        print(f"{name:40}{a:>14g}{b:>14g}{change:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog=f"{PACKAGE}.benchmarks",
+                                     description="Benchmark sizing and rate hot paths.")
+    parser.add_argument("-o", "--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="stub server latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of stub requests answered with HTTP 503")
+    parser.add_argument("--quick", action="store_true", help="smaller iteration counts")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record instrumentation spans and write a Chrome trace here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    if args.trace:
+        from ..utils import instrumentation
+        instrumentation.enable()
+    results = run_all(args.latency, args.error_rate, args.quick)
+    if args.trace:
+        instrumentation.dump_chrome_trace(args.trace)
+        results["instrumentation"] = instrumentation.summary()["spans"]
+    report = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report)
+    return 0
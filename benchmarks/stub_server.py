@@ -0,0 +1,129 @@
+# benchmarks/stub_server.py
+
+'''
+Local stand-in for the Frankfurter API.
+
+Serves /latest (from, optional comma-separated to) and /currencies from a
+fixed EUR-based rate table, with configurable latency, jitter and error
+rate, so the rate layer can be benchmarked without touching the network.
+
+Static files (e.g. an asset manifest and JSON files for the updater) can be
+served from `files` ({path: bytes}) with strong ETags and If-None-Match.
+
+    with StubRateServer(latency=0.02, error_rate=0.05) as stub:
+        stub.url          # http://127.0.0.1:<port>
+        stub.requests     # number of requests served so far
+'''
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# EUR-based reference table; values are only for consistent arithmetic
+EUR_RATES = {
+    "AUD": 1.65, "BGN": 1.9558, "BRL": 6.05, "CAD": 1.49, "CHF": 0.94,
+    "CNY": 7.85, "CZK": 25.1, "DKK": 7.46, "EUR": 1.0, "GBP": 0.85,
+    "HKD": 8.45, "HUF": 395.0, "IDR": 17600.0, "ILS": 4.05, "INR": 90.5,
+    "ISK": 150.0, "JPY": 160.3, "KRW": 1480.0, "MXN": 19.8, "MYR": 5.1,
+    "NOK": 11.6, "NZD": 1.8, "PHP": 62.5, "PLN": 4.3, "RON": 4.97,
+    "SEK": 11.4, "SGD": 1.46, "THB": 39.2, "TRY": 35.5, "USD": 1.08,
+    "ZAR": 20.1,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_file(self, data):
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.stub.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub._count()
+        delay = stub.latency + random.uniform(0, stub.jitter)
+        if delay:
+            time.sleep(delay)
+        if stub.error_rate and random.random() < stub.error_rate:
+            return self._send(503, {"message": "stub error"})
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path in stub.files:
+            return self._send_file(stub.files[url.path])
+        if url.path == "/currencies":
+            return self._send(200, {c: c for c in EUR_RATES})
+        if url.path != "/latest":
+            return self._send(404, {"message": "not found"})
+
+        base = query.get("from", ["EUR"])[0]
+        if base not in EUR_RATES:
+            return self._send(404, {"message": "not found"})
+        wanted = query.get("to", [None])[0]
+        quotes = wanted.split(",") if wanted else [c for c in EUR_RATES if c != base]
+        rates = {q: round(EUR_RATES[q] / EUR_RATES[base], 6)
+                 for q in quotes if q in EUR_RATES and q != base}
+        self._send(200, {"amount": 1.0, "base": base, "date": "2024-01-02", "rates": rates})
+
+
+class StubRateServer:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, port=0, files=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.files = dict(files or {})      # path -> bytes, replaceable while running
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,164 @@
+# pos_size_calc/cli.py
+
+"""
+Headless position sizing: stream CSV/JSONL rows in, sized rows out.
+
+    python -m pos_size_calc.cli trades.csv -o sized.csv
+    cat trades.jsonl | python -m pos_size_calc.cli --format jsonl
+
+Each row needs account, pct, price, base and quote (the same keys the
+Controller passes around); manual_rate, leverage and instrument (OANDA
+name such as XAG_USD) are optional. Rows are read, sized
+and written one at a time, so memory stays flat however long the input is.
+Nothing here imports Kivy.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+
+from .utils.logging_config import setup_logging
+from .tool_classes.position_sizer import PositionSizer
+
+RESULT_FIELDS = ["qty", "rate", "error"]
+REQUIRED_FIELDS = ("account", "pct", "price", "base", "quote")
+
+
+class UnreadableRow(dict):
+    """Stands in for an input line that could not be parsed; sized as an error row."""
+    def __init__(self, line_no, error):
+        super().__init__(line=line_no)
+        self.error = error
+
+
+# Function to pick csv/jsonl from an explicit flag or the file name
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    if path and path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def read_rows(stream, fmt):
+    """Yield one dict per input row (an UnreadableRow for a malformed line)."""
+    if fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield UnreadableRow(line_no, f"{type(e).__name__}: {e}")
+                continue
+            if isinstance(row, dict):
+                yield row
+            else:
+                yield UnreadableRow(line_no, f"ValueError: expected an object, got {type(row).__name__}")
+    else:
+        yield from csv.DictReader(stream)
+
+
+def size_row(row):
+    """Return row plus qty/rate, or plus error if it cannot be sized."""
+    out = dict(row)
+    if isinstance(row, UnreadableRow):
+        out["qty"], out["rate"], out["error"] = "", "", row.error
+        return out
+    # A short CSV row leaves fields as None; report it rather than size "NONE"
+    missing = [k for k in REQUIRED_FIELDS if row.get(k) is None or str(row[k]).strip() == ""]
+    if missing:
+        out["qty"], out["rate"] = "", ""
+        out["error"] = f"Missing field(s): {', '.join(missing)}"
+        return out
+    try:
+        manual = row.get("manual_rate")
+        leverage = row.get("leverage")
+        sizer = PositionSizer(
+            float(row["account"]),
+            float(row["pct"]),
+            float(row["price"]),
+            str(row["base"]).upper(),
+            str(row["quote"]).upper(),
+            manual_rate=float(manual) if manual not in (None, "") else None,
+            leverage=float(leverage) if leverage not in (None, "") else 1.0,
+            instrument=row.get("instrument") or None,
+        )
+        out["qty"], out["rate"] = sizer.calculate()
+        out["error"] = ""
+    except Exception as e:
+        out["qty"], out["rate"], out["error"] = "", "", f"{type(e).__name__}: {e}"
+    return out
+
+
+def size_rows(rows):
+    for row in rows:
+        yield size_row(row)
+
+
+def write_rows(results, stream, fmt, flush_every=100):
+    """Write results as they arrive; return the number of rows written."""
+    count = 0
+    writer = None
+    for result in results:
+        if fmt == "jsonl":
+            stream.write(json.dumps(result) + "\n")
+        else:
+            if writer is None:
+                names = [k for k in result if k not in RESULT_FIELDS] + RESULT_FIELDS
+                writer = csv.DictWriter(stream, fieldnames=names, extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(result)
+        count += 1
+        if count % flush_every == 0:
+            stream.flush()
+    stream.flush()
+    return count
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pos_size_calc.cli",
+        description="Size positions from CSV/JSONL rows without the GUI.",
+    )
+    parser.add_argument("input", nargs="?", default="-",
+                        help="input file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, or - for stdout (default)")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="input format (default: from file name, else csv)")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"],
+                        help="output format (default: same as input)")
+    parser.add_argument("--flush-every", type=int, default=100,
+                        help="flush output after this many rows")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(level=logging.WARNING)
+
+    in_fmt = detect_format(None if args.input == "-" else args.input, args.format)
+    if args.output_format:
+        out_fmt = args.output_format
+    else:
+        out_fmt = in_fmt if args.output == "-" else detect_format(args.output)
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        write_rows(size_rows(read_rows(src, in_fmt)), dst, out_fmt,
+                   flush_every=args.flush_every)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
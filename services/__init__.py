@@ -1,2 +1,3 @@
 
-from .startup import prewarm_rates, check_for_update
\ No newline at end of file
+from .startup import prewarm_rates, check_for_update, update_assets
+from .rate_refresh import RateRefresher
@@ -0,0 +1,160 @@
+# pos_size_calc/services/rate_refresh.py
+
+'''
+Push-based refresh of the rates currently on screen.
+
+Views watch() the pairs they show and subscribe() a callback. Every
+`interval` seconds a Clock event (no thread sleeps between ticks) queues one
+REFRESH job. The job groups the watched pairs' plan legs by base and makes
+one batched request per base. Each pair's new rate is compared with the
+last value pushed (or, before the first push, with the cached quotes as
+they stood before the fetch), and only pairs that changed are sent to
+subscribers on the main thread.
+
+When offline, or when every request fails, the next tick is pushed out with
+exponential backoff (retry_after, doubling up to max_backoff). stop()
+cancels the pending tick and drops any refresh still in flight.
+'''
+
+import logging
+
+from ..utils.network import CACHE_TTL, fetch_base_rates, group_by_base, rate_cache
+from ..utils.threads import run_in_executor, REFRESH
+from ..tool_classes.position_sizer import plan_legs, apply_plan
+
+# Relative change below which a rate counts as unchanged
+CHANGE_EPSILON = 1e-9
+
+
+def _kivy_schedule(fn, delay):
+    from kivy.clock import Clock
+    return Clock.schedule_once(fn, delay)
+
+
+class RateRefresher:
+    def __init__(self, interval=CACHE_TTL, retry_after=30, max_backoff=600,
+                 is_online=None, schedule=_kivy_schedule):
+        self.interval = interval
+        self.retry_after = retry_after
+        self.max_backoff = max_backoff
+        self.is_online = is_online          # optional callable; False skips the network
+        self._schedule = schedule           # fn(callback, delay) -> event with .cancel()
+        self._watched = {}                  # watch key -> (base, quote)
+        self._subscribers = []
+        self._last = {}                     # (base, quote) -> last pushed rate
+        self._event = None
+        self._running = False
+        self.failures = 0
+
+    # Function to show which pair a view (key) is displaying
+    def watch(self, key, base, quote):
+        self._watched[key] = (base, quote)
+
+    def unwatch(self, key):
+        self._watched.pop(key, None)
+
+    def subscribe(self, fn):
+        """fn(base, quote, rate) is called on the main thread for changed rates."""
+        if fn not in self._subscribers:
+            self._subscribers.append(fn)
+
+    def unsubscribe(self, fn):
+        if fn in self._subscribers:
+            self._subscribers.remove(fn)
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self, delay=None):
+        if self._running:
+            return
+        self._running = True
+        self._schedule_next(self.interval if delay is None else delay)
+
+    def stop(self):
+        self._running = False
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def refresh_now(self):
+        """Refresh immediately and restart the interval from here."""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        self._tick()
+
+    def next_delay(self):
+        if not self.failures:
+            return self.interval
+        return min(self.retry_after * 2 ** (self.failures - 1), self.max_backoff)
+
+    def _schedule_next(self, delay):
+        if not self._running:
+            return
+        if self._event is not None:     # never run two tick chains
+            self._event.cancel()
+        self._event = self._schedule(self._tick, delay)
+
+    def _tick(self, dt=None):
+        self._event = None
+        if not self._running:
+            return
+        pairs = sorted({p for p in self._watched.values() if p[0] != p[1]})
+        if not pairs:
+            return self._schedule_next(self.interval)
+        if self.is_online is not None and not self.is_online():
+            return self._on_failed(ConnectionError("offline"))
+        run_in_executor(self._refresh, self._on_refreshed, pairs, priority=REFRESH,
+                        supersede="rate-refresh", errback=self._on_failed)
+
+    def _refresh(self, pairs):
+        """Worker thread: one request per base; return {pair: rate} that changed."""
+        plans = {pair: plan_legs(*pair) for pair in pairs}
+        legs = {leg for _kind, keys in plans.values() for leg in keys}
+
+        before = {}
+        for leg in legs:
+            entry = rate_cache.peek(leg)
+            if entry is not None:
+                before[leg] = entry[1]
+
+        snapshots, errors = {}, []
+        for base in group_by_base(legs):
+            try:
+                snapshots[base] = fetch_base_rates(base)
+            except Exception as e:
+                errors.append(e)
+        if errors and not snapshots:
+            raise errors[-1]
+
+        changed = {}
+        for pair, (kind, keys) in plans.items():
+            try:
+                rate = apply_plan(kind, [snapshots[b][q] for b, q in keys])
+            except KeyError:
+                continue
+            old = self._last.get(pair)
+            if old is None and all(k in before for k in keys):
+                old = apply_plan(kind, [before[k] for k in keys])
+            if old is None or abs(rate - old) > CHANGE_EPSILON * abs(old):
+                changed[pair] = rate
+        return changed
+
+    def _on_refreshed(self, changed):
+        self.failures = 0
+        for (base, quote), rate in changed.items():
+            self._last[(base, quote)] = rate
+            for fn in list(self._subscribers):
+                try:
+                    fn(base, quote, rate)
+                except Exception:
+                    logging.exception("Rate subscriber failed")
+        self._schedule_next(self.interval)
+
+    def _on_failed(self, exc):
+        self.failures += 1
+        delay = self.next_delay()
+        logging.info(f"Rate refresh failed ({exc}); retrying in {delay}s")
+        self._schedule_next(delay)
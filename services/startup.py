@@ -1,20 +1,32 @@
 # pos_size_calc/services/startup.py
 
-import os, json, logging
+import logging
 from packaging.version import Version
 
-from ..assets import CURRENCIES,STANDARD_SET,REMOTE_VERSION_URL,ASSETS_JSONS
-from ..utils import run_in_executor,session,fetch_rate
+from .. import assets
+from ..assets import download_assets,local_version,remote_version
+from ..utils import run_in_executor,session,fetch_rates,group_by_base,warm_cache_from_store,PREWARM
 
 
 def prewarm_rates():
     """
-    Fire off fetch_rate for each standard pair on the shared executor.
+    Warm the rate cache off the main thread: first from the persistent rate
+    store, then with one batched fetch per base currency of the standard
+    pairs. Bases whose quotes are all still fresh are not fetched again.
+    Runs at PREWARM priority, so user-triggered jobs always go first.
     """
-    for pair in STANDARD_SET:
-        base, quote = pair[:3], pair[3:]
+    run_in_executor(_prewarm, priority=PREWARM)
+
+
+def _prewarm():
+    """Returns the per-base futures so callers (e.g. benchmarks) can wait on them."""
+    warm_cache_from_store()
+    futures = []
+    for base, quotes in group_by_base(assets.STANDARD_SET).items():
         # No callback—just warm the cache
-        run_in_executor(fetch_rate, None, base, quote)
+        futures.append(run_in_executor(fetch_rates, None, [(base, q) for q in quotes],
+                                       priority=PREWARM))
+    return futures
 
 
 def check_for_update(callback):
@@ -23,11 +35,8 @@ def check_for_update(callback):
     """
     def _check():
         try:
-            fn = os.path.join(ASSETS_JSONS, "asset_version.json")
-            local = json.load(open(fn))["asset_version"]
-            resp  = session.get(REMOTE_VERSION_URL, timeout=5)
-            resp.raise_for_status()
-            remote = resp.json().get("asset_version")
+            local = local_version()
+            remote = remote_version(session)
             if Version(remote) > Version(local):
                 return (local, remote)
         except Exception as e:
@@ -35,4 +44,20 @@ def check_for_update(callback):
         return None
 
     # Pass the result to callback on the Kivy thread
-    run_in_executor(_check, callback)
\ No newline at end of file
+    run_in_executor(_check, callback, priority=PREWARM)
+
+
+def update_assets(remote_ver, callback=None):
+    """
+    Download the changed asset files in the background; `callback(updated_names)`
+    runs on the Kivy main thread once they are swapped in. Failures are logged
+    and leave the current assets in place.
+    """
+    def _update():
+        try:
+            return download_assets(remote_ver, session=session)
+        except Exception as e:
+            logging.warning(f"Asset update failed: {e}")
+            return None
+
+    run_in_executor(_update, callback, priority=PREWARM)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+asset_updater_check.py
+
+Runs assets.updater.download_assets against benchmarks.StubRateServer on a
+scratch copy of assets_jsons (the real assets are never touched):
+
+  - a changed file is downloaded, the version stamp follows
+  - an unchanged manifest is a 304 and changes nothing
+  - a manifest hash the served file does not have fails, nothing swapped
+  - a corrupt download fails and leaves no temp files behind
+  - a manifest for another version than the one offered is refused
+  - a manifest naming an app-local file is refused
+
+Run from the directory containing pos_size_calc:
+    python -m pos_size_calc.testing.asset_updater_check
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import requests
+
+from .. import assets
+from ..assets import updater
+from ..assets.paths import ASSETS_JSONS
+from ..benchmarks import StubRateServer
+
+
+def publish(stub, remote, version, overrides=None):
+    """Serve `remote` under /assets/ with a fresh manifest."""
+    manifest = updater.build_manifest(version, remote)
+    files = {"/assets/" + name: (remote / name).read_bytes() for name in manifest["files"]}
+    files["/assets/" + updater.MANIFEST_NAME] = json.dumps(manifest).encode("utf-8")
+    files.update(overrides or {})
+    stub.files = files
+    return manifest
+
+
+def expect_error(label, fn):
+    try:
+        fn()
+    except updater.AssetUpdateError as e:
+        print(f"  ok: {label}: {e}")
+        return
+    raise AssertionError(f"{label}: no AssetUpdateError")
+
+
+def main():
+    scratch = Path(tempfile.mkdtemp(prefix="asset_updater_"))
+    local, remote = scratch / "local", scratch / "remote"
+    shutil.copytree(ASSETS_JSONS, local)
+    shutil.copytree(ASSETS_JSONS, remote)
+
+    resets = []
+    saved = (updater.ASSETS_JSONS, updater.UPDATE_STATE, assets.reset_assets)
+    updater.ASSETS_JSONS, updater.UPDATE_STATE = local, scratch / "state.json"
+    assets.reset_assets = lambda: resets.append(1)
+    session = requests.Session()
+    try:
+        with StubRateServer() as stub:
+            base = stub.url + "/assets/"
+            update = lambda ver=None: updater.download_assets(ver, base, session)
+
+            (remote / "asset_version.json").write_text('{"version": "2.0.0"}')
+            (remote / "currencies.json").write_text(
+                (remote / "currencies.json").read_text() + "\n")
+            publish(stub, remote, "2.0.0")
+            assert update("2.0.0") == ["asset_version.json", "currencies.json"]
+            assert updater.local_version() == "2.0.0" and resets
+            assert (local / "currencies.json").read_bytes() == (remote / "currencies.json").read_bytes()
+            print("  ok: delta download")
+
+            before = stub.not_modified
+            assert update() == [] and stub.not_modified == before + 1
+            print("  ok: unchanged manifest is a 304")
+
+            # Manifest announces a new currencies.json but the server still has the old one
+            (remote / "asset_version.json").write_text('{"version": "2.0.1"}')
+            manifest = updater.build_manifest("2.0.1", remote)
+            manifest["files"]["currencies.json"]["sha256"] = "0" * 64
+            stub.files["/assets/asset_version.json"] = (remote / "asset_version.json").read_bytes()
+            stub.files["/assets/manifest.json"] = json.dumps(manifest).encode("utf-8")
+            expect_error("stale file behind a new hash", update)
+            assert updater.local_version() == "2.0.0"
+
+            (remote / "pairs.json").write_text("[]")
+            publish(stub, remote, "2.0.1", {"/assets/pairs.json": b"[1]"})
+            pairs = (local / "pairs.json").read_bytes()
+            expect_error("corrupt download", update)
+            assert (local / "pairs.json").read_bytes() == pairs
+            assert updater.local_version() == "2.0.0"
+            assert not [n for n in os.listdir(local) if n.endswith(".part")]
+
+            publish(stub, remote, "2.0.1")
+            expect_error("version mismatch", lambda: update("3.0.0"))
+            assert update("2.0.1") == ["asset_version.json", "pairs.json"]
+            print("  ok: retry after failures")
+
+            stub.files["/assets/manifest.json"] = json.dumps(
+                {"version": "9", "files": {"previous_prices.json": {"sha256": "x"}}}).encode("utf-8")
+            expect_error("app-local file in manifest", update)
+        print("All asset updater checks passed.")
+    finally:
+        updater.ASSETS_JSONS, updater.UPDATE_STATE, assets.reset_assets = saved
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
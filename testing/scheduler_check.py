@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+scheduler_check.py
+
+Behaviour checks for utils.scheduler.PriorityExecutor:
+
+  - back-to-back submits to a pool with one idle worker run concurrently
+  - with one worker, queued jobs run INTERACTIVE > REFRESH > PREWARM,
+    in submission order within a class
+  - PREWARM jobs never occupy more than max_workers - reserved workers,
+    and an INTERACTIVE job still starts at once while they run
+  - superseding cancels a queued job and counts it once
+
+Run from the directory containing pos_size_calc:
+    python -m pos_size_calc.testing.scheduler_check
+"""
+
+import threading
+import time
+
+from ..utils.scheduler import PriorityExecutor, INTERACTIVE, REFRESH, PREWARM
+
+
+def check_burst():
+    pool = PriorityExecutor(max_workers=10, reserved=2)
+    pool.submit(lambda: None).result()      # leaves one idle worker
+    time.sleep(0.05)
+    start = time.perf_counter()
+    first = pool.submit(time.sleep, 0.5, priority=INTERACTIVE)
+    second = pool.submit(time.perf_counter, priority=INTERACTIVE)
+    waited = second.result(timeout=5) - start
+    assert waited < 0.25, f"second job waited {waited:.2f}s behind the first"
+    first.result()
+    pool.shutdown()
+    print(f"  ok: burst submit, second job started after {waited * 1000:.1f} ms")
+
+
+def check_priority_order():
+    pool = PriorityExecutor(max_workers=1, reserved=0)
+    gate = threading.Event()
+    order = []
+    pool.submit(gate.wait, priority=INTERACTIVE)     # holds the only worker
+    time.sleep(0.05)
+    jobs = [("prewarm-1", PREWARM), ("refresh-1", REFRESH), ("click-1", INTERACTIVE),
+            ("prewarm-2", PREWARM), ("click-2", INTERACTIVE), ("refresh-2", REFRESH)]
+    futures = [pool.submit(order.append, name, priority=p) for name, p in jobs]
+    gate.set()
+    for f in futures:
+        f.result(timeout=5)
+    expected = ["click-1", "click-2", "refresh-1", "refresh-2", "prewarm-1", "prewarm-2"]
+    assert order == expected, order
+    pool.shutdown()
+    print("  ok: priority order " + " > ".join(order))
+
+
+def check_prewarm_cap():
+    pool = PriorityExecutor(max_workers=4, reserved=2)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def background():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.1)
+        with lock:
+            running -= 1
+
+    futures = [pool.submit(background, priority=PREWARM) for _ in range(8)]
+    time.sleep(0.02)
+    start = time.perf_counter()
+    click = pool.submit(time.perf_counter, priority=INTERACTIVE)
+    waited = click.result(timeout=5) - start
+    for f in futures:
+        f.result(timeout=5)
+    assert peak <= pool.background_limit, f"{peak} PREWARM jobs ran at once"
+    assert waited < 0.05, f"INTERACTIVE job waited {waited:.2f}s behind PREWARM"
+    pool.shutdown()
+    print(f"  ok: PREWARM peak {peak}/{pool.background_limit}, "
+          f"click started after {waited * 1000:.1f} ms")
+
+
+def check_supersede():
+    pool = PriorityExecutor(max_workers=1, reserved=0)
+    running = pool.submit(time.sleep, 0.2, supersede="rate")
+    time.sleep(0.05)
+    queued = pool.submit(time.sleep, 0, supersede="rate")
+    latest = pool.submit(time.sleep, 0, supersede="rate")
+    latest.result(timeout=5)
+    assert not running.cancelled() and queued.cancelled()
+    assert not pool.is_current("rate", running) and pool.is_current("rate", latest)
+    assert pool.superseded == 1, pool.superseded
+    pool.shutdown()
+    print("  ok: supersede cancels the queued job, counted once")
+
+
+def main():
+    check_burst()
+    check_priority_order()
+    check_prewarm_cap()
+    check_supersede()
+    print("All scheduler checks passed.")
+
+
+if __name__ == "__main__":
+    main()
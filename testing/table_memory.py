@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+table_memory.py
+
+Memory benchmark: compact asset tables vs the structures they replaced.
+
+  - STANDARD_SET / OTHER_PAIRS as set()s of 6-char strings
+      vs PairTable (interned codes + packed uint16 keys)
+  - OANDA instruments as full JSON dicts
+      vs InstrumentIndex of __slots__ records
+
+Run from the directory containing pos_size_calc:
+    python -m pos_size_calc.testing.table_memory
+"""
+
+import gc
+import json
+import tracemalloc
+
+from ..assets.paths import ASSETS_JSONS
+from ..assets.loader import load_pairs_split, load_instrument_records
+from ..assets.tables import CurrencyCodes, PairTable
+from ..assets.instruments import InstrumentIndex
+
+
+def measure(build):
+    """Bytes still allocated by build()'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main():
+    standard, other = load_pairs_split()
+    standard, other = sorted(standard), sorted(other)
+    # Fresh string objects, as json.load would have produced them
+    std_json = json.dumps(standard)
+    other_json = json.dumps(other)
+    with open(ASSETS_JSONS / "oanda_inst2.json", 'r') as f:
+        inst_json = f.read()
+
+    def old_pairs():
+        return set(json.loads(std_json)), set(json.loads(other_json))
+
+    def new_pairs():
+        s, o = json.loads(std_json), json.loads(other_json)
+        codes = CurrencyCodes(c for p in s + o for c in (p[:3], p[3:]))
+        # Only the tables are kept; the parsed lists are dropped
+        return PairTable.from_pairs(s, codes), PairTable.from_pairs(o, codes)
+
+    def old_instruments():
+        return json.loads(inst_json)["instruments"]
+
+    def new_instruments():
+        return InstrumentIndex(load_instrument_records())
+
+    rows = [
+        ("pair tables", measure(old_pairs), measure(new_pairs)),
+        ("instruments", measure(old_instruments), measure(new_instruments)),
+    ]
+    print(f"{'':14}{'before':>12}{'after':>12}{'ratio':>8}")
+    for name, before, after in rows:
+        print(f"{name:14}{before:>12,}{after:>12,}{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,13 @@ __all__ = [
 
 # Import from sub-directory inits
 
-from .position_sizer import PositionSizer
+from .position_sizer import PositionSizer, size_batch
 from .fx_converter import ForexConverter
-from .ui_controller import Controller
\ No newline at end of file
+from .rate_matrix import RateMatrix
+
+# Controller pulls in Kivy, so only import it when asked for
+def __getattr__(name):
+    if name == "Controller":
+        from .ui_controller import Controller
+        return Controller
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
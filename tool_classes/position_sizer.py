@@ -1,39 +1,177 @@
 # tool_classes/position_sizer.py
 
 from math import floor
-from ..utils.network import fetch_rate
-from ..assets import STANDARD_SET
+from ..utils.network import fetch_rate, fetch_rates, last_known_rate
+from .. import assets
+from ..assets.pair_index import DIRECT, INVERSE, TRIANGULATE
+
+# numpy is only needed by size_batch; importing it costs ~100 ms, so it is
+# loaded on first use rather than on the UI's startup path
+np = None
+
+def load_numpy():
+    """Import numpy on first call; None if it is not installed (batch sizing is optional)."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+# Function to list the cached quotes a pair's plan reads: (kind, keys)
+# All keys of one plan come from a single base snapshot.
+def plan_legs(acct_curr, stock_curr):
+    kind, source = assets.PAIR_INDEX.plan(acct_curr, stock_curr)
+    if kind == DIRECT:
+        return kind, ((acct_curr, stock_curr),)
+    if kind == INVERSE:
+        return kind, ((stock_curr, acct_curr),)
+    if kind == TRIANGULATE:
+        return kind, ((source, acct_curr), (source, stock_curr))
+    return kind, ()
+
+# Function to turn the plan's quote values into the acct→stock rate
+def apply_plan(kind, values):
+    if kind == DIRECT:
+        return values[0]
+    if kind == INVERSE:
+        return 1.0 / values[0]
+    if kind == TRIANGULATE:
+        return values[1] / values[0]
+    return 1.0
+
+def resolve_rate(acct_curr, stock_curr, manual_rate=None):
+    """
+    Rate that converts an amount in acct_curr into stock_curr.
+    One pair-index lookup picks the plan and one fetch_rates() call reads
+    its quotes from a single base snapshot. A manual_rate is used as-is.
+    """
+    if acct_curr == stock_curr:
+        return 1.0
+    if manual_rate is not None:
+        return manual_rate
+    kind, keys = plan_legs(acct_curr, stock_curr)
+    values = fetch_rates(keys)
+    if len(values) < len(keys):
+        # Source snapshot lacks a leg: last-ditch direct quote
+        return fetch_rate(acct_curr, stock_curr)
+    return apply_plan(kind, [values[k] for k in keys])
+
+def last_known_quote(acct_curr, stock_curr):
+    """
+    (acct→stock rate, age_seconds) built from last-known quotes along the
+    pair's plan (age is that of the oldest leg), or None. Suitable to pass
+    on as manual_rate.
+    """
+    if acct_curr == stock_curr:
+        return 1.0, 0.0
+    kind, keys = plan_legs(acct_curr, stock_curr)
+    known = [last_known_rate(*k) for k in keys]
+    if all(k is not None for k in known):
+        return apply_plan(kind, [k[0] for k in known]), max(k[1] for k in known)
+    # e.g. only the direct quote was ever seen
+    return last_known_rate(acct_curr, stock_curr)
 
 class PositionSizer:
     def __init__(self, account_size, allocation_pct, stock_price,
-                 acct_curr, stock_curr, manual_rate=None):
+                 acct_curr, stock_curr, manual_rate=None,
+                 leverage=1.0, instrument=None):
         self.account_size = account_size
         self.allocation_pct = allocation_pct / 100.0
         self.stock_price = stock_price
         self.acct_curr = acct_curr
         self.stock_curr = stock_curr
         self.manual_rate = manual_rate
+        if leverage <= 0:
+            raise ValueError("Leverage must be positive")
+        self.leverage = leverage
+        # Instrument record (assets.Instrument) or its OANDA/display name
+        if isinstance(instrument, str):
+            instrument = assets.INSTRUMENTS.get(instrument)
+        self.instrument = instrument
 
     def calculate(self):
         allocated = self.account_size * (self.allocation_pct / 100.0)
 
         rate = 1.0
         if self.acct_curr != self.stock_curr:
-            # 2) Check both directions against STANDARD_SET
-            direct = (self.acct_curr, self.stock_curr)
-            inverse = (self.stock_curr, self.acct_curr)
-
-            if direct in STANDARD_SET:
-                raw = self.manual_rate if self.manual_rate is not None else fetch_rate(*direct)
-                rate = raw
-            elif inverse in STANDARD_SET:
-                raw = self.manual_rate if self.manual_rate is not None else fetch_rate(*inverse)
-                rate = 1.0 / raw
-            else:
-                # last-ditch: try the direct quote anyway
-                rate = self.manual_rate if self.manual_rate is not None else fetch_rate(*direct)
-
+            rate = resolve_rate(self.acct_curr, self.stock_curr, self.manual_rate)
             allocated *= rate
 
-        qty = floor(allocated / self.stock_price)
-        return qty, rate
\ No newline at end of file
+        # Leverage scales buying power, capped by the instrument's margin rate
+        leverage = self.leverage
+        if self.instrument is not None:
+            leverage = self.instrument.effective_leverage(leverage)
+        if leverage != 1.0:
+            allocated *= leverage
+
+        if self.instrument is None:
+            qty = floor(allocated / self.stock_price)
+        else:
+            qty = self.instrument.size_units(allocated / self.stock_price)
+        return qty, rate
+
+def size_batch(account_sizes, allocation_pcts, stock_prices,
+               acct_currs, stock_currs, manual_rates=None, leverages=None):
+    """
+    Vectorized PositionSizer.calculate over equal-length arrays.
+
+    Returns (qty, rate) as int64/float64 arrays; row i equals
+    PositionSizer(...).calculate() for the same inputs. Each distinct
+    currency pair is resolved once, and all quotes that need fetching are
+    read in a single cache pass (one request per stale base).
+    manual_rates may be None or an array with NaN where no override is set;
+    leverages may be None (1:1) or an array. Instrument rounding and order
+    limits are per-row lookups and stay with the scalar sizer.
+    """
+    if load_numpy() is None:
+        raise ImportError("size_batch requires numpy")
+
+    account = np.asarray(account_sizes, dtype=np.float64)
+    pct = np.asarray(allocation_pcts, dtype=np.float64)
+    price = np.asarray(stock_prices, dtype=np.float64)
+    acct = np.asarray(acct_currs, dtype="U3")
+    stock = np.asarray(stock_currs, dtype="U3")
+    if manual_rates is None:
+        manual = np.full(account.shape, np.nan)
+    else:
+        manual = np.asarray(manual_rates, dtype=np.float64)
+    if leverages is None:
+        leverage = np.ones(account.shape)
+    else:
+        leverage = np.asarray(leverages, dtype=np.float64)
+        if np.any(leverage <= 0):
+            raise ValueError("Leverage must be positive")
+    if np.any(price == 0):
+        raise ZeroDivisionError("stock price of zero in batch")
+
+    # One plan per distinct pair, broadcast back with the inverse index
+    pairs, idx = np.unique(np.char.add(acct, stock), return_inverse=True)
+    names = pairs.tolist()
+    plans = [plan_legs(p[:3], p[3:]) for p in names]
+
+    # Only pairs with at least one non-manual, cross-currency row are fetched
+    needs_fetch = np.zeros(len(pairs), dtype=bool)
+    needs_fetch[idx[(acct != stock) & np.isnan(manual)]] = True
+    wanted = [k for i in np.flatnonzero(needs_fetch) for k in plans[i][1]]
+    quotes = fetch_rates(wanted) if wanted else {}
+
+    rate_by_pair = np.full(len(pairs), np.nan)
+    for i in np.flatnonzero(needs_fetch):
+        kind, keys = plans[i]
+        if all(k in quotes for k in keys):
+            rate_by_pair[i] = apply_plan(kind, [quotes[k] for k in keys])
+        else:
+            # Legs the batch could not supply go through the scalar path
+            rate_by_pair[i] = resolve_rate(names[i][:3], names[i][3:])
+
+    rate = np.where(np.isnan(manual), rate_by_pair[idx], manual)
+    rate = np.where(acct == stock, 1.0, rate)
+
+    allocated = account * (pct / 100.0 / 100.0)
+    allocated = allocated * rate
+    allocated = allocated * leverage
+    qty = np.floor(allocated / price).astype(np.int64)
+    return qty, rate
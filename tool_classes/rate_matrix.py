@@ -0,0 +1,72 @@
+# tool_classes/rate_matrix.py
+
+import time
+from ..utils.network import fetch_base_rates, split_pair
+
+class RateMatrix:
+    """
+    Single-base snapshot of FX rates (e.g. every currency vs EUR).
+    Any cross rate is the ratio of two entries, so no further I/O is needed.
+    """
+    def __init__(self, base="EUR", rates=None, timestamp=None):
+        self.base = base
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self._rates = {base: 1.0}
+        if rates:
+            self.update(rates)
+
+    # Build a snapshot from one batched request for `base`
+    @classmethod
+    def fetch(cls, base="EUR"):
+        return cls(base, fetch_base_rates(base))
+
+    # Function to merge new base→quote rates into the snapshot
+    def update(self, rates, timestamp=None):
+        for quote, rate in rates.items():
+            self._rates[quote] = float(rate)
+        self._rates[self.base] = 1.0
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def __contains__(self, currency):
+        return currency in self._rates
+
+    def __len__(self):
+        return len(self._rates)
+
+    def currencies(self):
+        return sorted(self._rates)
+
+    def age(self):
+        return time.time() - self.timestamp
+
+    def rate_with_path(self, base, quote):
+        """
+        Return (rate, path) for base→quote.
+        path is the chain of currencies used: (base,) for identity,
+        (base, quote) when one side is the snapshot base, or
+        (base, pivot, quote) when the rate was triangulated through it.
+        """
+        if base == quote:
+            return 1.0, (base,)
+        try:
+            b = self._rates[base]
+            q = self._rates[quote]
+        except KeyError:
+            raise ValueError(f"No rate for {base}/{quote}")
+
+        if self.base in (base, quote):
+            path = (base, quote)
+        else:
+            path = (base, self.base, quote)
+        return q / b, path
+
+    def rate(self, base, quote):
+        return self.rate_with_path(base, quote)[0]
+
+    def cross_rates(self, pairs):
+        """Return {(base, quote): rate} for many pairs from this snapshot."""
+        out = {}
+        for pair in pairs:
+            base, quote = split_pair(pair)
+            out[(base, quote)] = self.rate(base, quote)
+        return out
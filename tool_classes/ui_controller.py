@@ -1,62 +1,125 @@
 # tool_classes/controller.py
 
 from functools import partial
+import logging
 import time
 
-from kivy.clock import Clock
-from ..utils.network import online_status,fetch_rate
-from ..utils.threads import run_in_executor,run_in_thread
-from .position_sizer import PositionSizer
+from .. import assets
+from ..utils.connectivity import connectivity
+from ..utils import instrumentation
+from ..utils.threads import run_in_executor, INTERACTIVE
+from .position_sizer import PositionSizer, last_known_quote, resolve_rate
+from ..services.rate_refresh import RateRefresher
 
 class Controller:
     def __init__(self, view=None):
         self.view = view    # a reference to PrimaryUI instance
-        self._stop_rate_loop = False
-        self.online = self.is_online()
+        # Never block the first frame: probe in the background, read the cache
+        connectivity.probe()
+        # Refreshes the displayed pair every CACHE_TTL seconds, pushing changes only
+        self.rate_refresher = RateRefresher(is_online=self.is_online)
     
-    # Function too hold online status
+    # Function too hold online status (cached, fed by every rate request)
     def is_online(self):
-        return online_status()
+        return connectivity.is_online()
+    
+    @property
+    def online(self):
+        return self.is_online()
     
     # Function to start the rate updater
     def start_rate_updates(self):
-        if self.online:
-            pass
+        self._show_connectivity(self.online)
+        connectivity.subscribe(self._on_connectivity_changed)
+        # Offline it keeps backing off and picks up once we are online again
+        self._watch_view_pair()
+        self.rate_refresher.subscribe(self._on_rate_changed)
+        self.rate_refresher.start()
+    
+    # Function to reflect online/offline in the rate field
+    def _show_connectivity(self, online):
+        if online:
+            if self.view.rate_input.hint_text.startswith("OFFLINE"):
+                self.view.rate_input.hint_text = "Fetching..."
         else:
             self.view.rate_input.hint_text = "OFFLINE - Enter rate manually."
     
-    # Function to run a loop
-    def _rate_loop(self):
-        while not self._stop_rate_loop:
-            self._fethc_and_push()
-            time.sleep(300) # CACHE_TTL in seconds
+    # Function to react when the connection drops or comes back
+    def _on_connectivity_changed(self, online):
+        self._show_connectivity(online)
+        if online:
+            # Back online: refresh now rather than at the end of the backoff
+            self.rate_refresher.failures = 0
+            self.rate_refresher.refresh_now()
+    
+    # Function to point the refresher at the pair the view shows
+    def _watch_view_pair(self):
+        base, quote = self.view.acc_curr.text, self.view.stock_curr.text
+        # Placeholders ("Select From: ") would fail every tick and back off real pairs
+        if base != quote and base in assets.CURRENCIES and quote in assets.CURRENCIES:
+            self.rate_refresher.watch("primary", base, quote)
+        else:
+            self.rate_refresher.unwatch("primary")
+    
+    # Function to show a refreshed rate if it is for the pair on screen
+    def _on_rate_changed(self, base, quote, rate):
+        if (base, quote) == (self.view.acc_curr.text, self.view.stock_curr.text):
+            self.view.update_rate(rate)
     
-    # Function to collect new rate
-    def _fetch_and_push(self):
+    # Function to resolve the rate for the pair currently selected
+    def _current_rate(self):
         base = self.view.acc_curr.text
         quote = self.view.stock_curr.text
         try:
-            rate = fetch_rate(base,quote)
+            # Same plan (direct/inverse/triangulated) the calculation will use
+            return resolve_rate(base,quote)
         except:
-            return
-        Clock.schedule_once(lambda dt, r=rate: self.view.update_rate(r))
+            return None
+    
+    # Function to show a freshly resolved rate
+    def _push_rate(self, rate):
+        if rate is not None:
+            self.view.update_rate(rate)
     
-    # Function to collect one off rate
+    # Function to collect one off rate; a newer request (the pair changed
+    # again) cancels or drops this one, and misses in flight are shared
     def fetch_rate_once(self):
-        run_in_thread(fn=self._fetch_and_push)
+        self._watch_view_pair()
+        run_in_executor(self._current_rate, self._push_rate,
+                        priority=INTERACTIVE, supersede="rate")
     
     # Function to stop updates
     def stop_rate_updates(self):
-        self._stop_rate_loop = True
+        connectivity.unsubscribe(self._on_connectivity_changed)
+        self.rate_refresher.stop()
+        self.rate_refresher.unsubscribe(self._on_rate_changed)
     
     # Function to prommpt manual input for FX rate
     def prompt_manual_rate(self):
         self.view.show_error("Offline - Please enter FX rate manually.")
     
     
+    # Function to describe how old a last-known rate is
+    @staticmethod
+    def format_age(seconds):
+        if seconds < 120:
+            return f"{int(seconds)}s"
+        if seconds < 7200:
+            return f"{int(seconds // 60)}m"
+        if seconds < 172800:
+            return f"{int(seconds // 3600)}h"
+        return f"{int(seconds // 86400)}d"
+
     def start_calculation(self, raw):
-        if not self.online and raw.get("manual_rate") is None:
-            return self.prompt_manual_rate()
+        manual_rate = raw.get("manual_rate")
+        if not self.online and manual_rate is None and raw["base"] != raw["quote"]:
+            # Offline: fall back to the last-known rate and say how old it is
+            known = last_known_quote(raw["base"], raw["quote"])
+            if known is None:
+                return self.prompt_manual_rate()
+            manual_rate, age = known
+            self.view.rate_input.hint_text = (
+                f"OFFLINE - last known rate, {self.format_age(age)} old")
 
         fn = partial(
             self._do_calculation,
@@ -65,17 +128,35 @@ class Controller:
             raw["pct"],
             raw["base"],
             raw["quote"],
-            raw.get("manual_rate")
+            manual_rate,
+            raw.get("leverage", 1.0),
+            raw.get("instrument")
         )
-        run_in_executor(fn, self._on_result)
+        instrumentation.count("calculation.requested")
+        # Only the latest click's result is shown
+        run_in_executor(fn, partial(self._on_result, started=time.perf_counter()),
+                        priority=INTERACTIVE, supersede="calculation",
+                        errback=self._on_error)
 
-    def _do_calculation(self, account, price, pct, base, quote, manual_rate=None):
+    def _do_calculation(self, account, price, pct, base, quote, manual_rate=None,
+                        leverage=1.0, instrument=None):
         """Runs off main thread—compute qty & rate."""
-        sizer = PositionSizer(account, pct, price, base, quote, manual_rate=manual_rate)
-        return sizer.calculate()
+        with instrumentation.span("calculation", "calc", pair=base + quote):
+            sizer = PositionSizer(account, pct, price, base, quote, manual_rate=manual_rate,
+                                  leverage=leverage, instrument=instrument)
+            return sizer.calculate()
+
+    def _on_error(self, exc):
+        """Back on main thread—the calculation raised."""
+        logging.info(f"Calculation failed: {exc!r}")
+        self.view.show_error("Calculation failed.")
 
-    def _on_result(self, result):
+    def _on_result(self, result, started=None):
         """Back on main thread—push to view."""
+        if started is not None:
+            # Click to result on screen: queue wait, rate fetch, maths and callback delay
+            instrumentation.record("calculation.end_to_end", started,
+                                   time.perf_counter() - started, "ui")
         if result:
             qty, rate = result
             self.view.update_result(qty, rate)
@@ -2,5 +2,6 @@ from .shared_imports import *
 from .main_app import MainApp
 from .root_ui import RootLayout
 from .scrollable_spinner import ScrollableSpinner
+from .recycle_picker import RecyclePicker, PickerPopup, PickerList
 from .prompts import show_update_prompt
 
@@ -1,24 +1,40 @@
 # pos_size_calc/ui_classes/main_app.py
 
 from kivy.app import App
+from kivy.clock import Clock
 
 from .root_ui import RootLayout
 from .prompts import show_update_prompt
-from ..assets.updater import download_assets
-from ..services.startup import prewarm_rates,check_for_update
+from ..services.startup import prewarm_rates,check_for_update,update_assets
+from ..utils.timeline import timeline
 
 
 
 
 class MainApp(App):
     def build(self):
-        return RootLayout()
+        root = RootLayout()
+        timeline.mark("ui_built")
+        return root
 
     def on_start(self):
+        timeline.mark("on_start")
+        # Frame 1 draws the core form; the tick after it is the first interactive
+        # frame, and the deferred UI stages start from there
+        Clock.schedule_once(lambda dt: Clock.schedule_once(self._after_first_frame))
+
         # 1) Warm rates
         prewarm_rates()
 
         # 2) Check assets; if needed, prompt user on the main loop
         check_for_update(lambda result: 
-            show_update_prompt(*result, download_assets) if result else None
-        )
\ No newline at end of file
+            show_update_prompt(*result, lambda: update_assets(result[1])) if result else None
+        )
+
+    def _after_first_frame(self, dt):
+        timeline.finish("first_frame")
+        self.root.primary.run_startup_stages()
+
+    def on_stop(self):
+        # Cancel the rate refresher's pending tick
+        self.root.primary.controller.stop_rate_updates()
\ No newline at end of file
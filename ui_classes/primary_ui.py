@@ -3,7 +3,8 @@ import json
 
 from .shared_imports import BoxLayout, GridLayout, Label, TextInput, Button, Popup, ScrollView
 from .scrollable_spinner import ScrollableSpinner
-from assets import CURRENCIES,STANDARD_SET,OTHER_PAIRS,OTHER_INSTRUMENTS
+from assets import CURRENCIES,STANDARD_SET,OTHER_PAIRS,OTHER_INSTRUMENTS,PAIR_INDEX
+from assets.pair_index import INVERSE
 
 
 
@@ -118,7 +119,7 @@ class PrimaryUI(BoxLayout):
         base = self.acc_curr.text
         quote = self.stock_curr.text
         direction = ""
-        if (base, quote) not in STANDARD_SET and (quote, base) in STANDARD_SET:
+        if PAIR_INDEX.plan(base, quote)[0] == INVERSE:
             direction = "(Inverted) "
         self.result_label.text = (
             f"{direction}1 {base} = {rate:.4f} {quote}\n"
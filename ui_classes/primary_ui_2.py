@@ -1,8 +1,10 @@
 # ui_classes/primary_ui.py
 
 from .shared_imports import *
-from .scrollable_spinner import ScrollableSpinner
-from ..assets import CURRENCIES,STANDARD_SET,OTHER_INSTRUMENTS
+from .recycle_picker import RecyclePicker, PickerPopup
+from .. import assets
+from ..utils.threads import run_in_executor, PREWARM
+from ..utils.timeline import timeline
 
 class PrimaryUI(BoxLayout):
     def __init__(self, controller, **kwargs):
@@ -22,7 +24,10 @@ class PrimaryUI(BoxLayout):
         
         # Account Currency
         form.add_widget(Label(text="Account Currency:"))
-        self.acc_curr = ScrollableSpinner(text="Select From: ", values=sorted(CURRENCIES))
+        self.acc_curr = RecyclePicker(text="Select From: ", title="Account Currency",
+                                      values_source=self._currency_values,
+                                      search_kinds=(assets.CURRENCY,))
+        self.acc_curr.bind(text=self.on_currency_change)
         form.add_widget(self.acc_curr)
         
         # Allocation % of account
@@ -37,7 +42,10 @@ class PrimaryUI(BoxLayout):
         
         # Stock Currency
         form.add_widget(Label(text="Stock Currency:"))
-        self.stock_curr = ScrollableSpinner(text="Select From: ", values=sorted(CURRENCIES))
+        self.stock_curr = RecyclePicker(text="Select From: ", title="Stock Currency",
+                                        values_source=self._currency_values,
+                                        search_kinds=(assets.CURRENCY,))
+        self.stock_curr.bind(text=self.on_currency_change)
         form.add_widget(self.stock_curr)
         
         # Stock Leverage
@@ -47,16 +55,25 @@ class PrimaryUI(BoxLayout):
 
         # FX-Pair Spinner
         form.add_widget(Label(text="Or pick a predefined pair:"))
-        self.pair_spinner = ScrollableSpinner(text="Select Pair", values=sorted(STANDARD_SET))
+        self.pair_spinner = RecyclePicker(text="Select Pair", title="Predefined Pairs",
+                                          values_source=self._pair_values,
+                                          search_kinds=(assets.PAIR,))
         self.pair_spinner.bind(text=self.on_pair_select)
         form.add_widget(self.pair_spinner)
 
         # Non-currency Instruments
         form.add_widget(Label(text="Other Instruments:"))
         # Will load from oanda_inst2.json in current version
-        other_insts = OTHER_INSTRUMENTS
-        self.other_inst_spinner = ScrollableSpinner(text="View Other Instruments", values=sorted(other_insts))
+        self.other_inst_spinner = RecyclePicker(text="View Other Instruments",
+                                                title="Other Instruments",
+                                                values_source=self._instrument_values,
+                                                search_kinds=(assets.INSTRUMENT,))
+        self.other_inst_spinner.bind(text=self.on_instrument_select)
+        self.selected_instrument = None
+        self._applying_instrument = False
         form.add_widget(self.other_inst_spinner)
+        # Every pair (standard and other), opened from the footer; built on first use
+        self._pair_browser = None
         
         # FX Rate field (auto‐populated or manual)
         form.add_widget(Label(text="FX Rate:"))
@@ -81,9 +98,6 @@ class PrimaryUI(BoxLayout):
         scroll.add_widget(form)
         self.add_widget(scroll)
         
-        # Activate rate updater
-        self.controller.start_rate_updates()
-        
         # Add final calculate button to process form inputs
         self.calc_btn = Button(text="Calculate", size_hint_y=None, height=40)
         self.calc_btn.bind(on_release=self.on_calculate)
@@ -93,15 +107,93 @@ class PrimaryUI(BoxLayout):
         self.result_label = Label(text="", size_hint_y=None, height=30)
         self.update_result
         self.add_widget(self.result_label)
+        
+        # Everything else waits until the form is on screen, one step per frame
+        self._startup_stages = [
+            self.controller.start_rate_updates,     # activate rate updater
+            self.acc_curr.load_values,
+            self.stock_curr.load_values,
+            self.pair_spinner.load_values,
+            self.other_inst_spinner.load_values,
+            self._prebuild_search_index,
+        ]
+    
+    # Function to run the deferred startup work, one stage per frame
+    def run_startup_stages(self, dt=None):
+        if not self._startup_stages:
+            return
+        stage = self._startup_stages.pop(0)
+        stage()
+        if self._startup_stages:
+            Clock.schedule_once(self.run_startup_stages)
+        else:
+            timeline.mark("ui_stages_done")
+    
+    # Functions to build the picker lists (on demand)
+    @staticmethod
+    def _currency_values():
+        return sorted(assets.CURRENCIES)
+    
+    @staticmethod
+    def _pair_values():
+        return assets.STANDARD_SET.sorted_names()
+    
+    @staticmethod
+    def _instrument_values():
+        return sorted(assets.OTHER_INSTRUMENTS)
+    
+    # Function to build the type-ahead index off the main thread
+    @staticmethod
+    def _prebuild_search_index():
+        run_in_executor(lambda: assets.SEARCH_INDEX, priority=PREWARM)
     
     # Function to allocate b/q according to selection
     def on_pair_select(self, spinner, text):
         """Update base/quote and delegate rate fetch."""
         if len(text) == 6:
+            self.selected_instrument = None
             self.acc_curr.text = text[:3]
             self.stock_curr.text = text[3:]
             self.controller.fetch_rate_once()
+
+    # Function to size against an OANDA instrument (margin, units, limits)
+    def on_instrument_select(self, spinner, text):
+        inst = assets.INSTRUMENTS.get(text)
+        if inst is None:
+            return
+        self.selected_instrument = inst.name
+        # Some are quoted in a metal (XAU_XAG -> XAG), which has no FX rate
+        if inst.quote_currency in assets.CURRENCIES:
+            self._applying_instrument = True
+            try:
+                self.stock_curr.text = inst.quote_currency
+            finally:
+                self._applying_instrument = False
+        self.controller.fetch_rate_once()
+
+    # Function to drop the instrument's limits once the user picks another currency
+    def on_currency_change(self, picker, text):
+        if self._applying_instrument or self.selected_instrument is None:
+            return
+        self.selected_instrument = None
+        self.other_inst_spinner.text = "View Other Instruments"
     
+    # Function to browse every known pair in a recycled list
+    def open_pair_browser(self, *_):
+        if self._pair_browser is None:
+            pairs = sorted(set(assets.STANDARD_SET) | set(assets.OTHER_PAIRS))
+            self._pair_browser = PickerPopup(values=pairs, title="All Pairs",
+                                             on_pick=self.on_browse_pick,
+                                             search_kinds=(assets.PAIR,))
+        self._pair_browser.open()
+
+    # Function to apply a pair picked in the browser
+    def on_browse_pick(self, pair):
+        if self.pair_spinner.text == pair:
+            self.on_pair_select(self.pair_spinner, pair)
+        else:
+            self.pair_spinner.text = pair   # fires on_pair_select
+
     # Function to update rate
     def update_rate(self,rate):
         # Controller calls to refresh FX rate field
@@ -117,16 +209,16 @@ class PrimaryUI(BoxLayout):
                 "price":        float(self.price_input.text),
                 "base":         self.acc_curr.text,
                 "quote":        self.stock_curr.text,
-                "manual_rate":  float(self.rate_input.text) if self.rate_input.text else None
+                "manual_rate":  float(self.rate_input.text) if self.rate_input.text else None,
+                "leverage":     float(self.lev_input.text) if self.lev_input.text else 1.0,
+                "instrument":   self.selected_instrument
             }
         except ValueError:
             self.show_error("Enter valid numbers in all fields.")
             return
 
-        if self.controller.online:   ########     NEED TO CHANGE?????? here to end of func
-            self.controller.start_calculation(raw)
-        else:
-            self.controller.prompt_manual_rate()
+        # Controller falls back to last-known rates (or a manual prompt) offline
+        self.controller.start_calculation(raw)
 
     # Function to update result after calculation runs
     def update_result(self, qty, rate):
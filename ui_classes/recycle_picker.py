@@ -0,0 +1,154 @@
+# ui_classes/recycle_picker.py
+
+'''
+Virtualized pickers built on RecycleView.
+
+Only the rows that fit on screen are instantiated, and they are recycled
+while scrolling, so opening a list of 900 pairs costs the same as opening
+one of 30 currencies. Each popup is built once and reused; changing the
+values only swaps the RecycleView's data list.
+
+Popups given search_kinds get a filter box driven by the assets search
+index (built on the first keystroke); each keystroke narrows the previous
+match range instead of rescanning the values. Matches are restricted to
+the popup's own values, so e.g. the standard-pairs picker never offers
+a pair it does not list.
+'''
+
+from kivy.metrics import dp
+from kivy.properties import ListProperty, StringProperty
+
+from .. import assets
+from ..assets.search import IncrementalSearch
+from .shared_imports import (
+    BoxLayout,
+    Button,
+    Popup,
+    TextInput,
+    RecycleView,
+    RecycleBoxLayout,
+    RecycleDataViewBehavior,
+)
+
+ROW_HEIGHT = dp(40)
+FILTER_LIMIT = 200
+
+
+class PickerRow(RecycleDataViewBehavior, Button):
+    """One recycled row; text (label) and value are filled in from the data dict."""
+    value = StringProperty("")
+
+    def on_release(self):
+        # PickerRow -> RecycleBoxLayout -> PickerList
+        if self.parent is not None:
+            self.parent.parent.dispatch("on_select", self.value or self.text)
+
+
+class PickerList(RecycleView):
+    """Scrollable list of strings; fires on_select(value) when a row is tapped."""
+    __events__ = ("on_select",)
+
+    def __init__(self, values=(), **kwargs):
+        super().__init__(**kwargs)
+        self.viewclass = PickerRow
+        layout = RecycleBoxLayout(orientation="vertical", size_hint_y=None,
+                                  default_size=(None, ROW_HEIGHT),
+                                  default_size_hint=(1, None), spacing=dp(2))
+        layout.bind(minimum_height=layout.setter("height"))
+        self.add_widget(layout)
+        self.set_values(values)
+
+    def set_values(self, values, labels=None):
+        if labels is None:
+            self.data = [{"text": v, "value": v} for v in values]
+        else:
+            self.data = [{"text": l, "value": v} for v, l in zip(values, labels)]
+        self.scroll_y = 1
+
+    def on_select(self, value):
+        pass
+
+
+class PickerPopup(Popup):
+    """Popup around a PickerList; calls on_pick(value) and closes on selection."""
+
+    def __init__(self, values=(), on_pick=None, search_kinds=None, **kwargs):
+        kwargs.setdefault("size_hint", (0.9, 0.9))
+        self.values = list(values)
+        self.picker = PickerList(values=self.values)
+        self._search_kinds = search_kinds
+        self._search = None
+        content = self.picker
+        if search_kinds:
+            self.filter_input = TextInput(multiline=False, hint_text="Type to filter",
+                                          size_hint_y=None, height=ROW_HEIGHT)
+            self.filter_input.bind(text=self._on_filter)
+            content = BoxLayout(orientation="vertical", spacing=dp(4))
+            content.add_widget(self.filter_input)
+            content.add_widget(self.picker)
+        super().__init__(content=content, **kwargs)
+        self._on_pick = on_pick
+        self.picker.bind(on_select=self._on_select)
+
+    def set_values(self, values):
+        self.values = list(values)
+        self._search = None     # its value filter is for the old list
+        self.picker.set_values(self.values)
+
+    def _on_filter(self, _input, text):
+        if not text.strip():
+            self.picker.set_values(self.values)
+            return
+        if self._search is None:
+            self._search = IncrementalSearch(assets.SEARCH_INDEX, kinds=self._search_kinds,
+                                             limit=FILTER_LIMIT, values=set(self.values))
+        hits = self._search.update(text)
+        self.picker.set_values([h[1] for h in hits], [h[2] for h in hits])
+
+    def _on_select(self, _list, value):
+        self.dismiss()
+        if self._search_kinds:
+            self.filter_input.text = ""     # next open starts unfiltered
+        if self._on_pick is not None:
+            self._on_pick(value)
+
+
+class RecyclePicker(Button):
+    """
+    Drop-in for ScrollableSpinner: a button whose `text` becomes the value
+    picked from a recycled popup list of `values`. Bind to `text` as before.
+    Pass values_source instead of values to defer building the list.
+    """
+    values = ListProperty()
+    title = StringProperty("Select")
+
+    def __init__(self, search_kinds=None, values_source=None, **kwargs):
+        self._popup = None
+        self._search_kinds = search_kinds
+        self._values_source = values_source
+        super().__init__(**kwargs)
+
+    def load_values(self):
+        """Fill `values` from values_source (a callable), once: on first open or earlier."""
+        if self._values_source is not None:
+            source, self._values_source = self._values_source, None
+            self.values = source()
+
+    def on_values(self, _instance, values):
+        if self._popup is not None:
+            self._popup.set_values(values)
+
+    def on_release(self):
+        self.open()
+
+    def open(self):
+        self.load_values()
+        # Built on first use, then reused: later opens create no widgets
+        if self._popup is None:
+            self._popup = PickerPopup(values=self.values, title=self.title,
+                                      on_pick=self._on_pick,
+                                      search_kinds=self._search_kinds)
+        self._popup.open()
+
+    def _on_pick(self, value):
+        self.text = value
@@ -3,6 +3,7 @@
 from .shared_imports import BoxLayout, Label, Button
 from .primary_ui_2 import PrimaryUI
 from ..tool_classes.ui_controller import Controller
+from ..utils.timeline import timeline
 
 
 
@@ -12,11 +13,14 @@ class RootLayout(BoxLayout):
         
         # Generate controllers
         controller = Controller()
+        timeline.mark("controller")
         
-        # Generate UIs
+        # Generate UIs (only the core form; the rest is staged, see PrimaryUI)
         self.header = Label(text="Position Sizer",size_hint_y=None, height=40)
         self.primary = PrimaryUI(controller=controller,size_hint_y=1)
+        timeline.mark("form")
         self.footer = Button(text="Browse All Pairs",size_hint_y=None, height=40)
+        self.footer.bind(on_release=self.primary.open_pair_browser)
 
         # Add widgets to Layout
         self.add_widget(self.header)
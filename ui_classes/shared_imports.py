@@ -9,6 +9,9 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 
 
 __all__ = [
@@ -23,4 +26,7 @@ __all__ = [
     "Label",
     "Button",
     "Popup",
+    "RecycleView",
+    "RecycleDataViewBehavior",
+    "RecycleBoxLayout",
 ]
@@ -8,13 +8,37 @@ from .threads import (
     run_in_thread,
     run_in_executor,
     executor,             # optional shared executor
+    INTERACTIVE,          # job priorities, most urgent first
+    REFRESH,
+    PREWARM,
+)
+
+from .dispatch import (
+    dispatcher,           # coalesced main-thread hand-off; set .error_handler
+    post,
 )
 
 from .logging_config import setup_logging
 
+from .connectivity import (
+    connectivity,         # cached online state; is_online() never blocks
+    ConnectivityMonitor,
+)
+
+from . import instrumentation   # timing spans, counters, Chrome-trace export
+
 from .network import (
     create_session,
     session,
     online_status,
-    fetch_rate
+    fetch_rate,
+    fetch_rates,
+    fetch_base_rates,
+    group_by_base,
+    warm_cache_from_store,
+    last_known_rate,
+    cache_stats,
+    rate_cache,
+    rate_router,
+    provider_stats,
 )
\ No newline at end of file
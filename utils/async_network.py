@@ -0,0 +1,160 @@
+# utils/async_network.py
+
+'''
+asyncio-native rate client, alongside the requests-based helpers in network.py.
+
+Uses one aiohttp session (keep-alive connection pool) and a semaphore to
+cap concurrent requests, so hundreds of pairs can be fanned out from an
+event loop (e.g. Kivy's async_run) without a thread per request. Results
+land in the same rate_cache / rate_store as the blocking client (the
+SQLite write is handed to the shared executor so it never blocks the
+loop), and concurrent awaits for the same base or pair share one
+in-flight request.
+
+    async with AsyncRateClient() as client:
+        rates = await client.fetch_rates(["EURUSD", "GBPJPY", ...])
+'''
+
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:     # async client is optional
+    aiohttp = None
+
+from .network import (
+    FRANKFURTER_URL,
+    rate_cache,
+    rate_store,
+    safe_store_call,
+    group_by_base,
+)
+from .threads import run_in_thread
+
+
+class AsyncRateClient:
+    def __init__(self, max_concurrency=8, pool_size=16, timeout=5,
+                 url=FRANKFURTER_URL):
+        if aiohttp is None:
+            raise ImportError("AsyncRateClient requires aiohttp")
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self._limiter = None
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # Session and limiter are created lazily so they bind to the running loop
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                             keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._limiter = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_json(self, params):
+        session = self._get_session()
+        async with self._limiter:
+            async with session.get(self.url, params=params) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+
+    # Function to record fetched rates: cache now, SQLite store on the shared pool
+    @staticmethod
+    def _remember(base, rates):
+        now = time.time()
+        rate_cache.put_many({(base, q): (now, float(r)) for q, r in rates.items()})
+        run_in_thread(safe_store_call, rate_store.put_many, base, rates, now, rate_cache.ttl)
+
+    # Function to share one task between concurrent awaits of the same key
+    async def _single_flight(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _request_base_rates(self, base):
+        data = await self._get_json({"from": base})
+        rates = {q: float(r) for q, r in data.get("rates", {}).items()}
+        if not rates:
+            raise ValueError(f"No rates for base {base}")
+        self._remember(base, rates)
+        return rates
+
+    async def _request_rate(self, base, quote):
+        data = await self._get_json({"from": base, "to": quote})
+        rate = data.get("rates", {}).get(quote)
+        if rate is None:
+            raise ValueError(f"No rate for {base}/{quote}")
+        self._remember(base, {quote: rate})
+        return float(rate)
+
+    async def fetch_base_rates(self, base):
+        """Return {quote: rate} for every quote of `base` from one request."""
+        return await self._single_flight(base, lambda: self._request_base_rates(base))
+
+    async def fetch_rate(self, base, quote):
+        """Awaitable counterpart of network.fetch_rate."""
+        cached = rate_cache.get((base, quote))
+        if cached is not None:
+            return cached
+        batch = self._inflight.get(base)
+        if batch is not None:
+            try:
+                rates = await asyncio.shield(batch)
+            except Exception:
+                # Like the blocking client: a failed batch falls back to this pair alone
+                rates = {}
+            if quote in rates:
+                return rates[quote]
+        return await self._single_flight((base, quote),
+                                         lambda: self._request_rate(base, quote))
+
+    async def fetch_rates(self, pairs, return_exceptions=False):
+        """
+        Return {(base, quote): rate} for many pairs, one concurrent request
+        per base with stale quotes. Failed bases are skipped when
+        return_exceptions is True, otherwise the first error is raised.
+        """
+        now = time.time()
+        grouped = group_by_base(pairs)
+        result = {}
+        stale = []
+        for base, quotes in grouped.items():
+            for quote in quotes:
+                rate = rate_cache.get((base, quote), now)
+                if rate is None:
+                    stale.append(base)
+                    break
+                result[(base, quote)] = rate
+
+        fetched = await asyncio.gather(
+            *(self.fetch_base_rates(base) for base in stale),
+            return_exceptions=return_exceptions,
+        )
+        for base, rates in zip(stale, fetched):
+            if isinstance(rates, BaseException):
+                continue
+            for quote in grouped[base]:
+                if quote in rates:
+                    result[(base, quote)] = rates[quote]
+        return result
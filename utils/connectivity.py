@@ -0,0 +1,132 @@
+# utils/connectivity.py
+
+'''
+Cached, event-driven online/offline state.
+
+Nothing here blocks the caller. The state is updated passively by every
+real rate request (report_success / report_failure from the network layer)
+and, when no request has said anything for a while, by a socket probe run
+on the shared executor. is_online() returns the cached answer at once and
+starts a background probe if that answer is stale: after max_age seconds
+while online, or after retry_interval seconds while offline, so recovery
+is noticed without a timer thread.
+
+Subscribers are called with the new state on the Kivy main thread whenever
+it flips. Until anything is known, the state is optimistically online.
+'''
+
+import logging
+import socket
+import threading
+import time
+
+from . import instrumentation
+
+
+def online_status(host="8.8.8.8", port=53, timeout=3):
+    """
+    Quick check if network is up by opening a socket to a public DNS.
+    Blocks for up to `timeout` seconds; use ConnectivityMonitor from the UI.
+    """
+    try:
+        socket.create_connection((host, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+class ConnectivityMonitor:
+    def __init__(self, probe=online_status, max_age=120, retry_interval=15):
+        self._probe_fn = probe
+        self.max_age = max_age
+        self.retry_interval = retry_interval
+        self.state = None           # True / False / None (unknown)
+        self.checked_at = None      # time.time() of the last evidence
+        self.changed_at = None
+        self._probing = False
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    @property
+    def online(self):
+        return self.state is not False
+
+    def is_online(self):
+        """Cached state; never blocks. Starts a background probe when stale."""
+        if self.stale():
+            self.probe()
+        return self.online
+
+    def stale(self, now=None):
+        if self.checked_at is None:
+            return True
+        limit = self.max_age if self.state else self.retry_interval
+        return (time.time() if now is None else now) - self.checked_at > limit
+
+    def age(self):
+        """Seconds since the last evidence, or None if nothing is known yet."""
+        return None if self.checked_at is None else time.time() - self.checked_at
+
+    def subscribe(self, fn):
+        """fn(online) runs on the main thread each time the state flips."""
+        if fn not in self._subscribers:
+            self._subscribers.append(fn)
+
+    def unsubscribe(self, fn):
+        if fn in self._subscribers:
+            self._subscribers.remove(fn)
+
+    def report_success(self):
+        self._set(True)
+
+    def report_failure(self, exc=None):
+        self._set(False)
+
+    def probe(self):
+        """Run the socket probe on the shared executor unless one is running."""
+        with self._lock:
+            if self._probing:
+                return None
+            self._probing = True
+        from .threads import run_in_executor, REFRESH
+        return run_in_executor(self._run_probe, priority=REFRESH)
+
+    def _run_probe(self):
+        try:
+            ok = self._probe_fn()
+        finally:
+            with self._lock:
+                self._probing = False
+        instrumentation.count("connectivity.probe")
+        self._set(ok)
+        return ok
+
+    def _set(self, online):
+        now = time.time()
+        with self._lock:
+            self.checked_at = now
+            changed = online != self.state
+            previous, self.state = self.state, online
+            if changed:
+                self.changed_at = now
+        if not changed:
+            return
+        logging.info(f"Connectivity: {'online' if online else 'offline'}")
+        # Going from unknown to online is what everyone assumed already
+        if previous is None and online:
+            return
+        if self._subscribers:
+            # Only touch the main loop when someone listens (headless callers don't)
+            from .dispatch import post
+            post(self._notify, online)
+
+    def _notify(self, online):
+        for fn in list(self._subscribers):
+            try:
+                fn(online)
+            except Exception:
+                logging.exception("Connectivity subscriber failed")
+
+
+# Process-wide monitor fed by every rate request
+connectivity = ConnectivityMonitor()
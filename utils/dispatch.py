@@ -0,0 +1,108 @@
+# utils/dispatch.py
+
+'''
+Coalesced hand-off of work to the Kivy main thread.
+
+Worker threads post() callables into one queue. The first post schedules a
+single Clock callback that drains the queue in order until a per-frame
+time budget is spent; anything left over is drained on the next frame. A
+burst of hundreds of results therefore costs one scheduled callback per
+frame instead of one per result, and rendering is never starved.
+
+Exceptions raised by posted callables, and job errors handed over with
+post_error(), go to `error_handler(exc, source)` on the main thread
+instead of dying silently on a pool thread.
+'''
+
+import logging
+import sys
+import threading
+import time
+from collections import deque
+
+from . import instrumentation
+
+
+def log_error(exc, source=None):
+    logging.error(f"Background job {source or ''} failed: {exc!r}",
+                  exc_info=(type(exc), exc, exc.__traceback__))
+
+
+class MainThreadDispatcher:
+    def __init__(self, budget=0.004, error_handler=log_error, schedule=None):
+        self.budget = budget                # seconds of main-thread work per frame
+        self.error_handler = error_handler
+        self._schedule = schedule           # fn(callback) -> run callback(dt) on the main loop
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def post(self, fn, *args, source=None):
+        """
+        Run fn(*args) on the main thread in a coming frame. Thread-safe.
+        source names fn in error reports when fn is only a wrapper.
+        """
+        self._queue.append((fn, args, time.perf_counter(), source))
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule_drain()
+
+    def post_error(self, exc, source=None):
+        """Deliver exc to the error handler on the main thread."""
+        self.post(self._handle_error, exc, source)
+
+    def pending(self):
+        return len(self._queue)
+
+    def has_main_loop(self):
+        """True when posted work will run: a schedule was given or Kivy is loaded."""
+        return self._schedule is not None or "kivy.clock" in sys.modules
+
+    def _handle_error(self, exc, source):
+        try:
+            self.error_handler(exc, source)
+        except Exception:
+            logging.exception("Error handler failed")
+
+    def _schedule_drain(self):
+        if self._schedule is not None:
+            self._schedule(self.drain)
+        else:
+            from kivy.clock import Clock
+            Clock.schedule_once(self.drain)
+
+    def drain(self, dt=None):
+        """Run queued callables until the budget is spent; reschedule the rest."""
+        traced = instrumentation.recorder.enabled
+        start = time.perf_counter()
+        deadline = start + self.budget
+        ran = 0
+        while self._queue:
+            fn, args, posted, source = self._queue.popleft()
+            now = time.perf_counter()
+            if traced:
+                instrumentation.record("main.callback_delay", posted, now - posted, "dispatch")
+            try:
+                fn(*args)
+            except Exception as e:
+                self._handle_error(e, source or getattr(fn, "__qualname__", fn))
+            ran += 1
+            if time.perf_counter() >= deadline:
+                break
+        if traced:
+            instrumentation.record("dispatch.drain", start, time.perf_counter() - start,
+                                   "dispatch", {"ran": ran, "left": len(self._queue)})
+
+        with self._lock:
+            if not self._queue:
+                self._scheduled = False
+                return
+        # Over budget with work left: continue on the next frame
+        self._schedule_drain()
+
+
+# The one dispatcher every executor callback goes through
+dispatcher = MainThreadDispatcher()
+post = dispatcher.post
@@ -0,0 +1,206 @@
+# utils/instrumentation.py
+
+'''
+Lightweight timing spans and counters for the hot paths.
+
+Disabled by default. While disabled, span() hands back one shared no-op
+context manager and count()/record() return after a single flag check, so
+the hooks can stay in place permanently.
+
+    from .instrumentation import span, count
+    with span("cache.lookup", "cache"):
+        ...
+    count("rate_cache.miss")
+
+Finished spans go into a bounded ring buffer (oldest dropped first). Export
+with summary() / log_summary(), a periodic summary on a background thread,
+or dump_chrome_trace(path) for chrome://tracing or https://ui.perfetto.dev.
+
+Setting POS_SIZE_CALC_TRACE=<path> enables recording at import and writes a
+Chrome trace to <path> at exit.
+'''
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_CAPACITY = 10_000
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "cat", "args", "start")
+
+    def __init__(self, recorder, name, cat, args):
+        self.recorder = recorder
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.recorder.record(self.name, self.start, duration, self.cat, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach extra args (e.g. hit=True) to the span before it closes."""
+        self.args.update(args)
+
+
+class Recorder:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.enabled = False
+        self._events = deque(maxlen=capacity)
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._reporter = None
+
+    def enable(self, capacity=None):
+        if capacity is not None and capacity != self._events.maxlen:
+            self._events = deque(self._events, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+        with self._lock:
+            self._counters.clear()
+
+    def span(self, name, cat="app", **args):
+        """Context manager timing its body; a shared no-op while disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def record(self, name, start, duration, cat="app", args=None):
+        """Record a span measured elsewhere (start is a perf_counter() value)."""
+        if not self.enabled:
+            return
+        # deque.append is atomic, so recording threads never contend on a lock
+        self._events.append((name, cat, start, duration, threading.get_ident(), args))
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def events(self):
+        return list(self._events)
+
+    def summary(self):
+        """{"spans": {name: count/total/p50/p95/max in ms}, "counters": {...}}"""
+        durations = {}
+        for name, _cat, _start, duration, _tid, _args in self.events():
+            durations.setdefault(name, []).append(duration)
+
+        spans = {}
+        for name, samples in sorted(durations.items()):
+            samples.sort()
+            n = len(samples)
+            spans[name] = {
+                "count": n,
+                "total_ms": round(sum(samples) * 1000, 3),
+                "p50_ms": round(samples[n // 2] * 1000, 3),
+                "p95_ms": round(samples[min(n - 1, int(0.95 * n))] * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3),
+            }
+        return {"spans": spans, "counters": self.counters()}
+
+    def log_summary(self, level=logging.INFO):
+        summary = self.summary()
+        for name, s in summary["spans"].items():
+            logging.log(level, f"span {name}: n={s['count']} p50={s['p50_ms']}ms "
+                               f"p95={s['p95_ms']}ms max={s['max_ms']}ms")
+        for name, value in sorted(summary["counters"].items()):
+            logging.log(level, f"counter {name}: {value}")
+
+    def start_periodic_summary(self, interval=60.0, level=logging.INFO):
+        """Log a summary every `interval` seconds on a daemon thread."""
+        self.stop_periodic_summary()
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.log_summary(level)
+
+        threading.Thread(target=loop, name="instrumentation-summary", daemon=True).start()
+        self._reporter = stop
+
+    def stop_periodic_summary(self):
+        if self._reporter is not None:
+            self._reporter.set()
+            self._reporter = None
+
+    def chrome_trace(self):
+        """The ring buffer as a Chrome trace-event dict ("X" complete events)."""
+        pid = os.getpid()
+        events = [{
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 3),
+            "dur": round(duration * 1e6, 3),
+            "pid": pid,
+            "tid": tid,
+            "args": args or {},
+        } for name, cat, start, duration, tid, args in self.events()]
+        return {"traceEvents": events, "otherData": {"counters": self.counters()}}
+
+    def dump_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+# Process-wide recorder and its bound shortcuts
+recorder = Recorder()
+span = recorder.span
+record = recorder.record
+count = recorder.count
+enable = recorder.enable
+disable = recorder.disable
+summary = recorder.summary
+dump_chrome_trace = recorder.dump_chrome_trace
+
+
+def _trace_from_env():
+    path = os.environ.get("POS_SIZE_CALC_TRACE")
+    if path:
+        recorder.enable()
+        atexit.register(recorder.dump_chrome_trace, path)
+
+
+_trace_from_env()
@@ -3,10 +3,17 @@
 '''
 Set up for logging --> Basic setup, with generic output.
 
-Can be adjusted per log level manually.
+Can be adjusted per log level manually. When instrumentation is recording
+(see utils/instrumentation.py), a span/counter summary is also logged every
+summary_interval seconds.
 '''
 
 import logging
 
-def setup_logging(level=logging.INFO, fmt="%(asctime)s [%(levelname)s] %(message)s"):
+from . import instrumentation
+
+def setup_logging(level=logging.INFO, fmt="%(asctime)s [%(levelname)s] %(message)s",
+                  summary_interval=300):
     logging.basicConfig(level=level, format=fmt)
+    if instrumentation.recorder.enabled and summary_interval:
+        instrumentation.recorder.start_periodic_summary(summary_interval)
@@ -3,9 +3,21 @@
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-import socket
 import time
 
+from ..assets.paths import RATE_STORE
+from .rate_store import RateStore, safe_store_call
+from .rate_cache import RateCache
+from .singleflight import SingleFlight
+from .instrumentation import recorder, span, record, count
+from .connectivity import connectivity, online_status
+from .providers import (
+    FRANKFURTER_URL,
+    FrankfurterProvider,
+    FloatratesProvider,
+    ProviderRouter,
+)
+
 def create_session(retries=3, backoff_factor=1,
                    status_forcelist=None) -> requests.Session:
     """Return a Session with a mounted retry strategy."""
@@ -24,18 +36,26 @@ def create_session(retries=3, backoff_factor=1,
 # one shared session for your app
 session = create_session()
 
-def online_status(host="8.8.8.8", port=53, timeout=3):
-    """
-    Quick check if network is up by opening a socket to a public DNS.
-    """
-    try:
-        socket.create_connection((host, port), timeout=timeout)
-        return True
-    except OSError:
-        return False
+# Rate providers fail fast (one quick retry); a slow source is covered by
+# hedging to the next provider rather than by waiting out backoff.
+provider_session = create_session(retries=1, backoff_factor=0.2)
+rate_router = ProviderRouter([
+    FrankfurterProvider(provider_session),
+    FloatratesProvider(provider_session),
+])
 
-_rate_cache = {}
 CACHE_TTL = 300  # seconds
+CACHE_MAXSIZE = 2048  # entries; ~31 currencies squared fits comfortably
+
+# Shared in-memory rate cache (thread-safe, LRU-bounded, TTL-expiring)
+rate_cache = RateCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+# Last-known rates persisted across restarts and shared between processes
+rate_store = RateStore(RATE_STORE)
+
+# In-flight requests: batches keyed by base, single quotes by (base, quote)
+_base_flights = SingleFlight()
+_pair_flights = SingleFlight()
 
 def fetch_rate(base: str, quote: str):
     """
@@ -44,20 +64,172 @@ def fetch_rate(base: str, quote: str):
     key = (base, quote)
     now = time.time()
 
-    if key in _rate_cache:
-        ts, cached = _rate_cache[key]
-        if now - ts < CACHE_TTL:
-            return cached
-
-    resp = session.get(
-        "https://api.frankfurter.app/latest",
-        params={"from": base, "to": quote},
-        timeout=5,
-    )
-    resp.raise_for_status()
-    rate = resp.json().get("rates", {}).get(quote)
-    if rate is None:
-        raise ValueError(f"No rate for {base}/{quote}")
-
-    _rate_cache[key] = (now, rate)
+    # The hit path is ~1us, so it only pays for a flag check when not tracing
+    traced = recorder.enabled
+    t0 = time.perf_counter() if traced else 0.0
+    cached = rate_cache.get(key, now)
+    if traced:
+        record("cache.lookup", t0, time.perf_counter() - t0, "cache",
+               {"hit": cached is not None})
+        count("rate_cache.hit" if cached is not None else "rate_cache.miss")
+    if cached is not None:
+        return cached
+
+    with span("fetch_rate.miss", "network", pair=base + quote):
+        # A batch for this base already in flight will bring the quote with it
+        batch = _base_flights.in_flight(base)
+        if batch is not None:
+            try:
+                rate = batch.result().get(quote)
+            except Exception:
+                rate = None
+            if rate is not None:
+                count("fetch_rate.joined_batch")
+                return float(rate)
+
+        # Concurrent misses for the same pair share one request
+        return _pair_flights.do(key, _request_rate, base, quote)
+
+
+def _request_rate(base: str, quote: str) -> float:
+    key = (base, quote)
+    now = time.time()
+
+    # A previous run or another process may already hold a fresh value
+    with span("store.get_fresh", "cache"):
+        stored = safe_store_call(rate_store.get_fresh, base, quote, now)
+    if stored is not None:
+        count("rate_store.hit")
+        rate_cache.put(key, stored[1], stored[0])
+        return float(stored[1])
+
+    rate = _routed(rate_router.fetch_pair, base, quote)
+    remember_rates(base, {quote: rate}, now)
     return float(rate)
+
+
+def _request_base_rates(base: str) -> dict:
+    """
+    One request for every quote of `base`; fills the cache with all of them.
+    """
+    rates = _routed(rate_router.fetch_base, base)
+    remember_rates(base, rates)
+    return rates
+
+
+def _routed(call, *args):
+    """Run a provider call and tell the connectivity monitor how it went."""
+    try:
+        result = call(*args)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        # Could not reach any provider; HTTP errors still prove we are online
+        connectivity.report_failure(e)
+        raise
+    connectivity.report_success()
+    return result
+
+
+def remember_rates(base: str, rates: dict, now=None):
+    """Record freshly fetched {quote: rate} in the cache and the persistent store."""
+    now = time.time() if now is None else now
+    rate_cache.put_many({(base, q): (now, float(r)) for q, r in rates.items()})
+    safe_store_call(rate_store.put_many, base, rates, now, rate_cache.ttl)
+
+
+def fetch_base_rates(base: str) -> dict:
+    """
+    Return {quote: rate} for every quote of `base` from a single request.
+    Concurrent callers for the same base wait on the one in-flight request.
+    """
+    return _base_flights.do(base, _request_base_rates, base)
+
+
+def split_pair(pair):
+    """Accept "EURUSD" or ("EUR", "USD") and return (base, quote)."""
+    if isinstance(pair, str):
+        return pair[:3], pair[3:]
+    return tuple(pair)
+
+
+def group_by_base(pairs) -> dict:
+    """Group pairs into {base: [quote, ...]}, keeping first-seen order."""
+    grouped = {}
+    for pair in pairs:
+        base, quote = split_pair(pair)
+        quotes = grouped.setdefault(base, [])
+        if quote not in quotes:
+            quotes.append(quote)
+    return grouped
+
+
+def fetch_rates(pairs) -> dict:
+    """
+    Return {(base, quote): rate} for many pairs with one request per base.
+    Bases whose requested quotes are all fresh in the cache are not fetched;
+    quotes the provider does not list are left out of the result.
+    """
+    with span("fetch_rates", "network"):
+        return _fetch_rates(pairs)
+
+
+def _fetch_rates(pairs) -> dict:
+    now = time.time()
+    result = {}
+    for base, quotes in group_by_base(pairs).items():
+        rates = {}
+        for quote in quotes:
+            rate = rate_cache.get((base, quote), now)
+            if rate is not None:
+                rates[quote] = rate
+
+        if len(rates) < len(quotes):
+            fetched = fetch_base_rates(base)
+            for quote in quotes:
+                if quote not in rates and quote in fetched:
+                    rates[quote] = fetched[quote]
+
+        for quote, rate in rates.items():
+            result[(base, quote)] = float(rate)
+    return result
+
+
+def warm_cache_from_store() -> int:
+    """
+    Load every still-fresh rate from the persistent store into the cache.
+    Returns the number of entries loaded.
+    """
+    fresh = safe_store_call(rate_store.load_fresh) or {}
+    rate_cache.put_many(fresh)
+    return len(fresh)
+
+
+def last_known_rate(base: str, quote: str):
+    """
+    Return (rate, age_seconds) for the newest rate we have ever seen,
+    fresh or not, from memory or the persistent store; None if unknown.
+    """
+    now = time.time()
+    cached = rate_cache.get_stale((base, quote), now)
+    stored = safe_store_call(rate_store.get, base, quote)
+    if stored is not None:
+        age = max(0.0, now - stored[1])
+        if cached is None or age < cached[1]:
+            return float(stored[0]), age
+    if cached is not None:
+        return float(cached[0]), cached[1]
+    return None
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss/stale/eviction counters of the shared rate cache, plus how many
+    callers were coalesced onto an in-flight request.
+    """
+    stats = rate_cache.stats()
+    stats["coalesced"] = _base_flights.coalesced + _pair_flights.coalesced
+    return stats
+
+
+def provider_stats() -> dict:
+    """Per-provider p50/p95 latency, failure counts and health, plus hedge count."""
+    return rate_router.summary()
@@ -0,0 +1,275 @@
+# utils/providers.py
+
+'''
+Pluggable FX rate sources with hedged requests and latency-based routing.
+
+Each provider answers fetch_base(base) -> {quote: rate} and
+fetch_pair(base, quote) -> rate. ProviderRouter keeps per-provider latency
+samples (p50/p95) and failure streaks, tries the fastest healthy source
+first, and fires a hedged request at the next one if the first has not
+answered within hedge_after seconds. The first success wins.
+
+Attempts run on the shared priority executor at the calling job's class,
+so a click's request never queues behind prewarm attempts. Callers are
+usually pool jobs themselves: an attempt the pool has not started within
+steal_after seconds is taken back and run on the caller's thread, so a
+saturated pool (or the PREWARM cap) costs the hedge, never a deadlock.
+'''
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import requests
+
+from . import instrumentation
+
+FRANKFURTER_URL = "https://api.frankfurter.app/latest"
+FLOATRATES_URL = "https://www.floatrates.com/daily/{base}.json"
+
+
+class RateProvider(ABC):
+    name = "provider"
+
+    def __init__(self, session, timeout=5):
+        self.session = session
+        self.timeout = timeout
+
+    @abstractmethod
+    def fetch_base(self, base: str) -> dict:
+        """{quote: rate} for every quote the source has for `base`."""
+
+    def fetch_pair(self, base: str, quote: str) -> float:
+        rate = self.fetch_base(base).get(quote)
+        if rate is None:
+            raise ValueError(f"{self.name}: no rate for {base}/{quote}")
+        return rate
+
+
+class FrankfurterProvider(RateProvider):
+    name = "frankfurter"
+
+    def __init__(self, session, timeout=5, url=FRANKFURTER_URL):
+        super().__init__(session, timeout)
+        self.url = url
+
+    def _get(self, params):
+        resp = self.session.get(self.url, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json().get("rates", {})
+
+    def fetch_base(self, base):
+        rates = {q: float(r) for q, r in self._get({"from": base}).items()}
+        if not rates:
+            raise ValueError(f"{self.name}: no rates for base {base}")
+        return rates
+
+    def fetch_pair(self, base, quote):
+        rate = self._get({"from": base, "to": quote}).get(quote)
+        if rate is None:
+            raise ValueError(f"{self.name}: no rate for {base}/{quote}")
+        return float(rate)
+
+
+class FloatratesProvider(RateProvider):
+    name = "floatrates"
+
+    def __init__(self, session, timeout=5, url=FLOATRATES_URL):
+        super().__init__(session, timeout)
+        self.url = url
+
+    def fetch_base(self, base):
+        resp = self.session.get(self.url.format(base=base.lower()), timeout=self.timeout)
+        resp.raise_for_status()
+        rates = {}
+        for entry in resp.json().values():
+            code, rate = entry.get("code"), entry.get("rate")
+            if code and rate is not None:
+                rates[code.upper()] = float(rate)
+        if not rates:
+            raise ValueError(f"{self.name}: no rates for base {base}")
+        return rates
+
+
+class ProviderStats:
+    """Rolling latency samples and failure streak for one provider."""
+    def __init__(self, window=100, max_failures=3, cooldown=60):
+        self.samples = deque(maxlen=window)
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.samples.append(seconds)
+            if ok:
+                self.successes += 1
+                self.consecutive_failures = 0
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+                self.last_failure = time.monotonic()
+
+    def percentile(self, pct):
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+    def healthy(self):
+        if self.consecutive_failures < self.max_failures:
+            return True
+        # Let one request through again once the cooldown has passed
+        return time.monotonic() - self.last_failure >= self.cooldown
+
+    def summary(self):
+        return {
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "samples": len(self.samples),
+            "successes": self.successes,
+            "failures": self.failures,
+            "healthy": self.healthy(),
+        }
+
+
+class ProviderRouter:
+    def __init__(self, providers, hedge_after=0.8, steal_after=0.02, executor=None):
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+        self.steal_after = steal_after
+        self.hedges = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._executor = executor   # default: the shared pool, resolved on first call
+
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            from .threads import executor
+            self._executor = executor
+        from .scheduler import current_priority
+        return self._executor.submit(fn, *args, priority=current_priority())
+
+    def stats_for(self, provider):
+        stats = self._stats.get(provider.name)
+        if stats is None:
+            stats = self._stats.setdefault(provider.name, ProviderStats())
+        return stats
+
+    def ranked(self):
+        """
+        Healthy providers fastest-first by p95, those on a failure streak
+        after them, then unhealthy ones.
+        """
+        def key(item):
+            idx, p = item
+            stats = self.stats_for(p)
+            p95 = stats.percentile(95)
+            # Untried providers keep their registration order at the front
+            return (not stats.healthy(), stats.consecutive_failures > 0,
+                    p95 if p95 is not None else 0.0, idx)
+        return [p for _, p in sorted(enumerate(self.providers), key=key)]
+
+    def _timed(self, provider, method, args):
+        t0 = time.perf_counter()
+        try:
+            result = getattr(provider, method)(*args)
+        except Exception:
+            elapsed = time.perf_counter() - t0
+            self.stats_for(provider).record(elapsed, False)
+            instrumentation.record(f"http.{provider.name}", t0, elapsed, "network",
+                                   {"method": method, "ok": False})
+            raise
+        elapsed = time.perf_counter() - t0
+        self.stats_for(provider).record(elapsed, True)
+        instrumentation.record(f"http.{provider.name}", t0, elapsed, "network",
+                               {"method": method, "ok": True})
+        return result
+
+    def call(self, method, *args):
+        """
+        Run provider.<method>(*args) on the best source, hedging to the next
+        one after hedge_after seconds; the first success wins.
+        """
+        order = self.ranked()
+        if not order:
+            raise RuntimeError("No rate providers configured")
+        pending = {}
+        errors = []
+        launched = 0
+
+        def launch():
+            nonlocal launched
+            provider = order[launched]
+            launched += 1
+            pending[self._submit(self._timed, provider, method, args)] = provider
+
+        launch()
+        hedge_at = time.monotonic() + self.hedge_after
+        while pending:
+            timeout = None
+            if launched < len(order):
+                timeout = max(0.0, hedge_at - time.monotonic())
+            if any(not f.running() and not f.done() for f in pending):
+                timeout = self.steal_after if timeout is None else min(timeout, self.steal_after)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Attempts the pool has not started yet run here instead
+                stolen = [f for f in pending if f.cancel()]
+                if stolen:
+                    for future in stolen:
+                        provider = pending.pop(future)
+                        try:
+                            return self._timed(provider, method, args)
+                        except Exception as e:
+                            logging.info(f"Rate provider {provider.name} failed: {e}")
+                            errors.append(e)
+                elif launched < len(order) and time.monotonic() >= hedge_at:
+                    with self._lock:
+                        self.hedges += 1
+                    instrumentation.count("providers.hedged")
+                    launch()
+                    hedge_at = time.monotonic() + self.hedge_after
+                    continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logging.info(f"Rate provider {provider.name} failed: {e}")
+                    errors.append(e)
+            if not pending and launched < len(order):
+                launch()
+                hedge_at = time.monotonic() + self.hedge_after
+        raise _routing_error(errors)
+
+    def fetch_base(self, base):
+        return self.call("fetch_base", base)
+
+    def fetch_pair(self, base, quote):
+        return self.call("fetch_pair", base, quote)
+
+    def summary(self):
+        out = {p.name: self.stats_for(p).summary() for p in self.providers}
+        out["hedges"] = self.hedges
+        return out
+
+
+def _routing_error(errors):
+    """
+    The error to raise once every provider failed (each was logged as it
+    came in). A connection error only if no provider was reached at all,
+    which callers read as offline; otherwise the first error from a
+    provider that did answer.
+    """
+    unreachable = (requests.ConnectionError, requests.Timeout)
+    answered = [e for e in errors if not isinstance(e, unreachable)]
+    return answered[0] if answered else errors[0]
@@ -0,0 +1,131 @@
+# utils/rate_cache.py
+
+'''
+Bounded, thread-safe LRU cache for FX rates with TTL expiry.
+
+Entries are (timestamp, rate) keyed by (base, quote). Expired entries are
+dropped lazily when read, and swept before any LRU eviction when the cache
+is full. Counters for hits, misses, stale serves, expirations and
+evictions are kept so CACHE_TTL / maxsize can be tuned under real load.
+'''
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateCache:
+    def __init__(self, maxsize=2048, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_serves = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get_entry(key) is not None
+
+    def get(self, key, now=None):
+        """Return the fresh rate for key, or None (counted as a miss)."""
+        entry = self.get_entry(key, now, count=True)
+        return None if entry is None else entry[1]
+
+    def get_entry(self, key, now=None, count=False):
+        """Return the fresh (timestamp, rate) for key, or None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and now - entry[0] >= self.ttl:
+                # Lazy expiry
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry
+
+    def peek(self, key):
+        """Return (timestamp, rate) of any age without touching LRU order or counters."""
+        with self._lock:
+            return self._data.get(key)
+
+    def get_stale(self, key, now=None):
+        """
+        Return (rate, age_seconds) whatever its age, or None.
+        Serving an expired entry is counted as a stale serve.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            age = max(0.0, now - entry[0])
+            if age >= self.ttl:
+                self.stale_serves += 1
+            return entry[1], age
+
+    def put(self, key, rate, timestamp=None):
+        self.put_many({key: (time.time() if timestamp is None else timestamp, rate)})
+
+    def put_many(self, entries):
+        """Insert {key: (timestamp, rate)}; newer timestamps win."""
+        with self._lock:
+            for key, entry in entries.items():
+                current = self._data.get(key)
+                if current is not None and current[0] > entry[0]:
+                    continue
+                self._data[key] = entry
+                self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._purge_expired_locked(time.time())
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _purge_expired_locked(self, now):
+        expired = [k for k, (ts, _) in self._data.items() if now - ts >= self.ttl]
+        for key in expired:
+            del self._data[key]
+        self.expirations += len(expired)
+        return len(expired)
+
+    def purge_expired(self, now=None):
+        """Drop every expired entry; return how many were removed."""
+        with self._lock:
+            return self._purge_expired_locked(time.time() if now is None else now)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "stale_serves": self.stale_serves,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.stale_serves = 0
+            self.expirations = self.evictions = 0
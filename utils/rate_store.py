@@ -0,0 +1,106 @@
+# utils/rate_store.py
+
+'''
+Persistent last-known FX rates, shared across restarts and processes.
+
+SQLite in WAL mode: any number of processes can read while one writes.
+Each row keeps when it was fetched and the TTL it was fetched under, so a
+reader can tell fresh values from last-known ones and report their age.
+'''
+
+import logging
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    base        TEXT NOT NULL,
+    quote       TEXT NOT NULL,
+    rate        REAL NOT NULL,
+    fetched_at  REAL NOT NULL,
+    ttl         REAL NOT NULL,
+    PRIMARY KEY (base, quote)
+) WITHOUT ROWID
+"""
+
+
+class RateStore:
+    def __init__(self, path, timeout=5.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialised = False
+
+    # One connection per thread; sqlite3 connections are not shareable
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialised:
+                    with conn:
+                        conn.execute(_SCHEMA)
+                    self._initialised = True
+            self._local.conn = conn
+        return conn
+
+    def put_many(self, base, rates, fetched_at=None, ttl=300):
+        """Upsert {quote: rate} for `base`."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(base, q, float(r), fetched_at, ttl) for q, r in rates.items()]
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?, ?)", rows)
+
+    def put(self, base, quote, rate, fetched_at=None, ttl=300):
+        self.put_many(base, {quote: rate}, fetched_at, ttl)
+
+    def get(self, base, quote):
+        """Return (rate, fetched_at, ttl) or None."""
+        return self._conn().execute(
+            "SELECT rate, fetched_at, ttl FROM rates WHERE base = ? AND quote = ?",
+            (base, quote)).fetchone()
+
+    def get_fresh(self, base, quote, now=None):
+        """Return (fetched_at, rate) if the stored value is within its TTL."""
+        row = self.get(base, quote)
+        now = time.time() if now is None else now
+        if row is None or now - row[1] >= row[2]:
+            return None
+        return row[1], row[0]
+
+    def load_fresh(self, now=None):
+        """Return {(base, quote): (fetched_at, rate)} for every fresh row."""
+        now = time.time() if now is None else now
+        rows = self._conn().execute(
+            "SELECT base, quote, rate, fetched_at FROM rates WHERE ? - fetched_at < ttl",
+            (now,))
+        return {(b, q): (ts, r) for b, q, r, ts in rows}
+
+    def last_known(self, base, quote, now=None):
+        """Return (rate, age_seconds) regardless of TTL, or None."""
+        row = self.get(base, quote)
+        if row is None:
+            return None
+        now = time.time() if now is None else now
+        return row[0], max(0.0, now - row[1])
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def safe_store_call(fn, *args, **kwargs):
+    """Run a store operation, logging instead of raising on SQLite errors."""
+    try:
+        return fn(*args, **kwargs)
+    except sqlite3.Error as e:
+        logging.warning(f"Rate store unavailable: {e}")
+        return None
@@ -0,0 +1,144 @@
+# utils/scheduler.py
+
+'''
+Bounded worker pool with priority classes and superseding.
+
+Jobs wait in one heap ordered by (priority, submission order), so a user's
+click (INTERACTIVE) runs ahead of periodic refreshes (REFRESH), and both
+run ahead of the startup prewarm (PREWARM). PREWARM jobs may occupy at most
+max_workers - reserved workers at once, which keeps threads free for
+interactive work even while a long prewarm is in progress.
+
+A job submitted with supersede=key replaces any earlier job with the same
+key. The earlier job is cancelled if it has not started; if it is already
+running, is_current(key, future) reports it as stale so its result can be
+dropped.
+
+current_priority() tells a running job which class it was submitted at,
+so work it fans out (e.g. hedged HTTP attempts) can keep the same place
+in line.
+'''
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+INTERACTIVE, REFRESH, PREWARM = range(3)
+
+_current = threading.local()
+
+
+def current_priority(default=REFRESH):
+    """Priority of the pool job running on this thread, or `default` outside one."""
+    return getattr(_current, "priority", default)
+
+
+class PriorityExecutor:
+    def __init__(self, max_workers=10, reserved=2, name="worker"):
+        if max_workers < 1 or not 0 <= reserved < max_workers:
+            raise ValueError("Need max_workers >= 1 and 0 <= reserved < max_workers")
+        self.max_workers = max_workers
+        self.background_limit = max_workers - reserved
+        self._name = name
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._idle = 0
+        self._background = 0
+        self._latest = {}        # supersede key -> newest Future (kept until replaced)
+        self._shutdown = False
+        self.superseded = 0      # queued jobs cancelled by a newer one (running ones
+                                 # finish; their results are dropped by the caller)
+
+    def submit(self, fn, *args, priority=REFRESH, supersede=None, **kwargs):
+        """Queue fn(*args, **kwargs) and return its Future."""
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+            if supersede is not None:
+                previous = self._latest.get(supersede)
+                # cancel() fails once the job is running; that case is not counted here
+                if previous is not None and previous.cancel():
+                    self.superseded += 1
+                self._latest[supersede] = future
+            heapq.heappush(self._queue, (priority, next(self._seq), future, supersede,
+                                         fn, args, kwargs))
+            # Idle threads already notified but not yet awake still count as
+            # idle, so compare against the queue rather than checking _idle == 0
+            if len(self._queue) > self._idle and len(self._threads) < self.max_workers:
+                self._spawn()
+            self._cond.notify()
+        return future
+
+    def is_current(self, key, future):
+        """False once a newer job has been submitted under the same key."""
+        with self._cond:
+            return self._latest.get(key, future) is future
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for item in self._queue:
+                    item[2].cancel()
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for t in threads:
+                t.join()
+
+    def _spawn(self):
+        t = threading.Thread(target=self._work, daemon=True,
+                             name=f"{self._name}-{len(self._threads)}")
+        self._threads.append(t)
+        t.start()
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                if self._queue:
+                    priority = self._queue[0][0]
+                    # The heap top is the most urgent job; if it is a capped
+                    # background job there is nothing else this thread may run
+                    if priority < PREWARM or self._background < self.background_limit:
+                        if priority >= PREWARM:
+                            self._background += 1
+                        return heapq.heappop(self._queue)
+                elif self._shutdown:
+                    return None
+                self._idle += 1
+                self._cond.wait()
+                self._idle -= 1
+
+    def _finish(self, priority):
+        if priority >= PREWARM:
+            with self._cond:
+                self._background -= 1
+                self._cond.notify()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            priority, _seq, future, _key, fn, args, kwargs = job
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                _current.priority = priority
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                _current.priority = REFRESH
+                self._finish(priority)
@@ -0,0 +1,49 @@
+# utils/singleflight.py
+
+'''
+Single-flight call collapsing.
+
+The first caller for a key runs the work; anyone asking for the same key
+while it is running waits on that call's future instead of repeating it.
+'''
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0   # callers that waited instead of running
+
+    def in_flight(self, key):
+        """Return the Future for a running call on key, or None."""
+        with self._lock:
+            return self._calls.get(key)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once per key at a time and share its result."""
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
@@ -1,32 +1,85 @@
 # utils/threads.py
 
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from kivy.clock import Clock
+import time
 
-# Shared executor for pre-warming or batch jobs
-executor = ThreadPoolExecutor(max_workers=10)
+from . import instrumentation
+from .dispatch import dispatcher, log_error
+from .scheduler import PriorityExecutor, INTERACTIVE, REFRESH, PREWARM
+
+# The one shared pool for background work. Jobs run by priority class
+# (INTERACTIVE > REFRESH > PREWARM); two workers are kept back from PREWARM
+# jobs so a click never waits behind the startup prewarm.
+executor = PriorityExecutor(max_workers=10, reserved=2)
 
 
 def run_in_thread(fn, *args, **kwargs):
     """
-    Fire off fn(*args, **kwargs) in a daemon thread.
-    Useful for non-blocking one-off calls.
+    Fire off fn(*args, **kwargs) on the shared pool without a callback.
+    Useful for non-blocking one-off calls; returns the job's Future.
     """
-    t = threading.Thread(target=fn, args=args, kwargs=kwargs, daemon=True)
-    t.start()
-    return t
+    return run_in_executor(fn, None, *args, **kwargs)
 
 
-def run_in_executor(fn, callback=None, *args, **kwargs):
+def run_in_executor(fn, callback=None, *args, priority=REFRESH, supersede=None,
+                    errback=None, **kwargs):
     """
-    Submit fn(*args, **kwargs) to the shared executor.
-    If callback is provided, schedule callback(result) on the Kivy main loop.
+    Submit fn(*args, **kwargs) to the shared executor at `priority`.
+    If callback is provided, callback(result) runs on the Kivy main loop via
+    the coalesced dispatcher; if fn raises, errback(exc) runs there instead
+    (or the dispatcher's error handler when no errback is given). Errors of
+    jobs without either are reported the same way, so fire-and-forget work
+    never fails silently; without a Kivy main loop they are logged directly.
+    Kivy is only imported once a callback is actually scheduled, so headless
+    callers can use the executor without pulling in the GUI stack.
+
+    A job submitted with supersede=key cancels the previous job with that key
+    if it has not started; if it is already running, its callback is dropped.
     """
-    future = executor.submit(fn, *args, **kwargs)
-    if callback:
-        def _cb(fut):
-            result = fut.result()
-            Clock.schedule_once(lambda dt: callback(result))
-        future.add_done_callback(_cb)
-    return future
\ No newline at end of file
+    name = fn
+    if instrumentation.recorder.enabled:
+        fn = _traced_job(fn, time.perf_counter())
+    future = executor.submit(fn, *args, priority=priority, supersede=supersede, **kwargs)
+
+    def _cb(fut):
+        if fut.cancelled():
+            instrumentation.count("executor.superseded")
+            return
+        exc = fut.exception()
+        if exc is not None:
+            if errback:
+                dispatcher.post(_deliver, errback, exc, supersede, fut,
+                                source=_job_name(errback))
+            elif dispatcher.has_main_loop():
+                dispatcher.post_error(exc, _job_name(name))
+            else:
+                log_error(exc, _job_name(name))
+        elif callback:
+            dispatcher.post(_deliver, callback, fut.result(), supersede, fut,
+                            source=_job_name(callback))
+    future.add_done_callback(_cb)
+    return future
+
+
+def _deliver(callback, value, supersede, future):
+    # Checked on the main thread, so a result overtaken while queued is dropped too
+    if supersede is not None and not executor.is_current(supersede, future):
+        instrumentation.count("executor.superseded")
+        return
+    callback(value)
+
+
+def _traced_job(fn, submitted):
+    """Wrap fn so its queue wait and run time are recorded as spans."""
+    name = _job_name(fn)
+    def job(*args, **kwargs):
+        started = time.perf_counter()
+        instrumentation.record("executor.queue_wait", submitted, started - submitted,
+                               "executor", {"job": name})
+        with instrumentation.span("executor.run", "executor", job=name):
+            return fn(*args, **kwargs)
+    return job
+
+
+def _job_name(fn):
+    fn = getattr(fn, "func", fn)    # unwrap functools.partial
+    return getattr(fn, "__qualname__", type(fn).__name__)
\ No newline at end of file
@@ -0,0 +1,97 @@
+# utils/timeline.py
+
+'''
+Startup timeline: named marks from process start to the first interactive
+frame.
+
+    from .utils.timeline import timeline
+    timeline.mark("ui_built")
+    ...
+    timeline.finish("first_frame")   # logs the timeline once
+
+Offsets are measured from the process start time reported by the OS where
+available (Linux /proc), otherwise from when this module was imported.
+finish() logs one line, records each stage as an instrumentation span and,
+if POS_SIZE_CALC_TIMELINE=<path> is set, appends the timeline as one JSON
+line to <path> so startups can be compared across commits.
+'''
+
+import json
+import logging
+import os
+import time
+
+from . import instrumentation
+
+_IMPORTED_WALL = time.time()
+_IMPORTED_PERF = time.perf_counter()
+
+
+def process_start_time():
+    """Wall-clock process start time, or None if the OS does not say."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (after the parenthesised command name) is starttime in ticks
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        # Boot time from uptime (btime in /proc/stat is truncated to whole seconds)
+        with open("/proc/uptime") as f:
+            boot = time.time() - float(f.read().split()[0])
+        return boot + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimeline:
+    def __init__(self):
+        start = process_start_time()
+        # Express the process start on the perf_counter clock
+        if start is None or start > _IMPORTED_WALL:
+            self.origin = _IMPORTED_PERF
+            self.origin_source = "import"
+        else:
+            self.origin = _IMPORTED_PERF - (_IMPORTED_WALL - start)
+            self.origin_source = "process"
+        self.marks = []
+        self.finished = False
+
+    def mark(self, name):
+        """Record `name` at the current time (ignored once finished)."""
+        if not self.finished:
+            self.marks.append((name, time.perf_counter()))
+
+    def elapsed_ms(self):
+        return round((time.perf_counter() - self.origin) * 1000, 1)
+
+    def as_dict(self):
+        return {
+            "origin": self.origin_source,
+            "marks": [(name, round((t - self.origin) * 1000, 1)) for name, t in self.marks],
+        }
+
+    def finish(self, name="first_frame"):
+        if self.finished:
+            return
+        self.mark(name)
+        self.finished = True
+
+        previous = self.origin
+        for stage, t in self.marks:
+            instrumentation.record(f"startup.{stage}", previous, t - previous, "startup")
+            previous = t
+        timeline = self.as_dict()
+        logging.info("Startup timeline (ms): " +
+                     ", ".join(f"{stage}={ms}" for stage, ms in timeline["marks"]))
+
+        path = os.environ.get("POS_SIZE_CALC_TIMELINE")
+        if path:
+            timeline["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(timeline) + "\n")
+            except OSError as e:
+                logging.info(f"Startup timeline not written: {e}")
+
+
+# The one timeline for this process
+timeline = StartupTimeline()